@@ -0,0 +1,68 @@
+"""
+Micro-benchmark of TokenAmount construction and comparison.
+
+Run from the project root: python -m benchmarks.token_amount
+"""
+
+import timeit
+import tracemalloc
+from decimal import Decimal
+
+from libs.eth_async.data.models import TokenAmount
+
+
+class EagerTokenAmount:
+    """
+    The previous TokenAmount: Wei, Ether and Gwei are computed in the constructor.
+    """
+
+    def __init__(self, amount, decimals: int = 18, wei: bool = False, gwei: bool = False) -> None:
+        if wei:
+            self.Wei = int(amount)
+            self.Ether = Decimal(str(amount)) / 10**decimals
+            self.Gwei = self.Wei / Decimal(10**9)
+        elif gwei:
+            self.Gwei = Decimal(str(amount))
+            self.Wei = int(self.Gwei * 10**9)
+            self.Ether = Decimal(self.Wei) / 10**decimals
+        else:
+            self.Ether = Decimal(str(amount))
+            self.Wei = int(self.Ether * 10**decimals)
+            self.Gwei = self.Wei / Decimal(10**9)
+
+        self.decimals = decimals
+
+
+CASES = {
+    "from wei": ("cls(1_234_567_890_123_456_789, wei=True)", "cls(1_234_567_890_123_456_789, wei=True)"),
+    "from ether": ("cls(0.001)", "cls(0.001)"),
+    "balance check": (
+        "cls(1_234_567_890_123_456_789, wei=True).Ether < cls(0.001).Ether",
+        "cls(1_234_567_890_123_456_789, wei=True) < cls(0.001)",
+    ),
+    "compare": ("balance.Ether < minimum.Ether", "balance < minimum"),
+}
+
+
+def main(number: int = 200_000) -> None:
+    for name, statements in CASES.items():
+        results = []
+        for cls, stmt in zip((EagerTokenAmount, TokenAmount), statements):
+            variables = {"cls": cls, "balance": cls(1_234_567_890_123_456_789, wei=True), "minimum": cls(0.001)}
+            results.append(timeit.timeit(stmt, number=number, globals=variables) / number * 1e9)
+
+        eager, compact = results
+        print(f"{name:<14} eager: {eager:8.1f} ns | compact: {compact:8.1f} ns | x{eager / compact:.1f}")
+
+    sizes = []
+    for cls in (EagerTokenAmount, TokenAmount):
+        tracemalloc.start()
+        amounts = [cls(i, wei=True) for i in range(10_000)]
+        sizes.append(tracemalloc.get_traced_memory()[0] / len(amounts))
+        tracemalloc.stop()
+
+    print(f"{'memory':<14} eager: {sizes[0]:8.1f} B  | compact: {sizes[1]:8.1f} B  | x{sizes[0] / sizes[1]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@ WALLETS_DB = os.path.join(FILES_DIR, "wallets.db")
 SETTINGS_FILE = os.path.join(FILES_DIR, "settings.yaml")
 RESERVE_PROXY_FILE = os.path.join(FILES_DIR, "reserve_proxy.txt")
 RESERVE_TWITTER_FILE = os.path.join(FILES_DIR, "reserve_twitter.txt")
+CHAINS_CACHE_FILE = os.path.join(FILES_DIR, "chains_cache.json")
+CHAIN_DATA_DB = os.path.join(FILES_DIR, "chain_data.db")
 
 TEMPLATE_SETTINGS_FILE = os.path.join(ROOT_DIR, "utils", "settings_template.yaml")
 ABIS_DIR = os.path.join(ROOT_DIR, "data", "abis")
@@ -1,4 +1,10 @@
+import os
 import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
 
 import yaml
 from loguru import logger
@@ -7,41 +13,189 @@ from data.config import LOG_FILE, SETTINGS_FILE
 from libs.eth_async.classes import Singleton
 
 
+def _range(json_data: Mapping, key: str, bound: str):
+    return (json_data.get(key) or {}).get(bound)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    """
+    An immutable, parsed view of files/settings.yaml.
+
+    A new snapshot is built only when the file changes on disk, so the instance can be shared freely between coroutines.
+    """
+
+    check_git_updates: bool = True
+    private_key_encryption: bool = False
+    threads: int = 4
+    processes: int = 1
+    signer_backend: str = "inline"
+    signer_workers: int | None = None
+    gas_estimate_margin: float = 1.2
+    rpc_hedge: bool = False
+    rpc_hedge_delay: float = 1.0
+    isolate_proxies: bool = True
+    range_wallets_to_run: tuple = ()
+    exact_wallets_to_run: tuple = ()
+    shuffle_wallets: bool = True
+    show_wallet_address_logs: bool = True
+    log_level: str = "INFO"
+    random_pause_start_wallet_min: int | None = None
+    random_pause_start_wallet_max: int | None = None
+    random_pause_between_actions_min: int | None = None
+    random_pause_between_actions_max: int | None = None
+    random_pause_wallet_after_completion_sprite_types_game_min: int | None = None
+    random_pause_wallet_after_completion_sprite_types_game_max: int | None = None
+    random_pause_wallet_after_all_completion_min: int | None = None
+    random_pause_wallet_after_all_completion_max: int | None = None
+    capmonster_api_key: str = ""
+    network_for_bridge: tuple = ()
+    auto_replace_proxy: bool = True
+    random_eth_for_bridge_min: float | None = None
+    random_eth_for_bridge_max: float | None = None
+    random_irys_games_min: int | None = None
+    random_irys_games_max: int | None = None
+    retry: int = 3
+    multiple_mint: bool = False
+    raw: Mapping = field(default_factory=lambda: MappingProxyType({}), repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, json_data: dict) -> "SettingsSnapshot":
+        return cls(
+            check_git_updates=json_data.get("check_git_updates", True),
+            private_key_encryption=json_data.get("private_key_encryption", False),
+            threads=json_data.get("threads", 4),
+            processes=json_data.get("processes", 1),
+            signer_backend=json_data.get("signer_backend", "inline"),
+            signer_workers=json_data.get("signer_workers"),
+            gas_estimate_margin=json_data.get("gas_estimate_margin", 1.2),
+            rpc_hedge=json_data.get("rpc_hedge", False),
+            rpc_hedge_delay=json_data.get("rpc_hedge_delay", 1.0),
+            isolate_proxies=json_data.get("isolate_proxies", True),
+            range_wallets_to_run=tuple(json_data.get("range_wallets_to_run", [])),
+            exact_wallets_to_run=tuple(json_data.get("exact_wallets_to_run", [])),
+            shuffle_wallets=json_data.get("shuffle_wallets", True),
+            show_wallet_address_logs=json_data.get("show_wallet_address_logs", True),
+            log_level=json_data.get("log_level", "INFO"),
+            random_pause_start_wallet_min=_range(json_data, "random_pause_start_wallet", "min"),
+            random_pause_start_wallet_max=_range(json_data, "random_pause_start_wallet", "max"),
+            random_pause_between_actions_min=_range(json_data, "random_pause_between_actions", "min"),
+            random_pause_between_actions_max=_range(json_data, "random_pause_between_actions", "max"),
+            random_pause_wallet_after_completion_sprite_types_game_min=_range(
+                json_data, "random_pause_wallet_after_completion_sprite_types_game", "min"
+            ),
+            random_pause_wallet_after_completion_sprite_types_game_max=_range(
+                json_data, "random_pause_wallet_after_completion_sprite_types_game", "max"
+            ),
+            random_pause_wallet_after_all_completion_min=_range(json_data, "random_pause_wallet_after_all_completion", "min"),
+            random_pause_wallet_after_all_completion_max=_range(json_data, "random_pause_wallet_after_all_completion", "max"),
+            capmonster_api_key=json_data.get("capmonster_api_key", ""),
+            network_for_bridge=tuple(json_data.get("network_for_bridge", [])),
+            auto_replace_proxy=json_data.get("auto_replace_proxy ", True),
+            random_eth_for_bridge_min=_range(json_data, "random_eth_for_bridge", "min"),
+            random_eth_for_bridge_max=_range(json_data, "random_eth_for_bridge", "max"),
+            random_irys_games_min=_range(json_data, "random_irys_games", "min"),
+            random_irys_games_max=_range(json_data, "random_irys_games", "max"),
+            retry=json_data.get("retry", 3),
+            multiple_mint=json_data.get("multiple_mint", False),
+            raw=_freeze(json_data),
+        )
+
+
 class Settings(Singleton):
+    """
+    Process-wide access point to the current SettingsSnapshot.
+
+    Calling Settings() is cheap: the YAML file is parsed once and re-read only when its mtime changes. The mtime itself is
+    checked at most once per CHECK_INTERVAL seconds. Attribute access is forwarded to the current snapshot.
+    """
+
+    CHECK_INTERVAL = 1.0
+
+    _snapshot: SettingsSnapshot | None = None
+    _mtime: float | None = None
+    _checked_at: float = 0.0
+    _subscribers: list = []
+    _lock = threading.Lock()
+
     def __init__(self):
-        with open(SETTINGS_FILE, "r") as file:
-            json_data = yaml.safe_load(file) or {}
-
-        self.check_git_updates = json_data.get("check_git_updates", True)
-        self.private_key_encryption = json_data.get("private_key_encryption", False)
-        self.threads = json_data.get("threads", 4)
-        self.range_wallets_to_run = json_data.get("range_wallets_to_run", [])
-        self.exact_wallets_to_run = json_data.get("exact_wallets_to_run", [])
-        self.shuffle_wallets = json_data.get("shuffle_wallets", True)
-        self.show_wallet_address_logs = json_data.get("show_wallet_address_logs", True)
-        self.log_level = json_data.get("log_level", "INFO")
-        self.random_pause_start_wallet_min = json_data.get("random_pause_start_wallet", {}).get("min")
-        self.random_pause_start_wallet_max = json_data.get("random_pause_start_wallet", {}).get("max")
-        self.random_pause_between_actions_min = json_data.get("random_pause_between_actions", {}).get("min")
-        self.random_pause_between_actions_max = json_data.get("random_pause_between_actions", {}).get("max")
-        self.random_pause_wallet_after_completion_sprite_types_game_min = json_data.get(
-            "random_pause_wallet_after_completion_sprite_types_game", {}
-        ).get("min")
-        self.random_pause_wallet_after_completion_sprite_types_game_max = json_data.get(
-            "random_pause_wallet_after_completion_sprite_types_game", {}
-        ).get("max")
-        self.random_pause_wallet_after_all_completion_min = json_data.get("random_pause_wallet_after_all_completion", {}).get("min")
-        self.random_pause_wallet_after_all_completion_max = json_data.get("random_pause_wallet_after_all_completion", {}).get("max")
-        self.capmonster_api_key = json_data.get("capmonster_api_key", "")
-        self.network_for_bridge = json_data.get("network_for_bridge", [])
-        self.auto_replace_proxy = json_data.get("auto_replace_proxy ", True)
-        self.random_eth_for_bridge_min = json_data.get("random_eth_for_bridge", {}).get("min")
-        self.random_eth_for_bridge_max = json_data.get("random_eth_for_bridge", {}).get("max")
-        self.random_irys_games_min = json_data.get("random_irys_games", {}).get("min")
-        self.random_irys_games_max = json_data.get("random_irys_games", {}).get("max")
-
-        self.retry = json_data.get("retry", 3)
-        self.multiple_mint = json_data.get("multiple_mint", False)
+        self.reload()
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.snapshot, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"Settings are read-only, edit {SETTINGS_FILE} instead")
+
+    @property
+    def snapshot(self) -> SettingsSnapshot:
+        return Settings._snapshot
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Re-read the settings file if it changed since the last load.
+
+        :param bool force: re-read the file even if its mtime did not change
+        :return bool: whether a new snapshot was loaded
+        """
+        now = time.monotonic()
+        if not force and Settings._snapshot is not None and now - Settings._checked_at < self.CHECK_INTERVAL:
+            return False
+
+        with Settings._lock:
+            Settings._checked_at = now
+            mtime = os.stat(SETTINGS_FILE).st_mtime
+            if not force and Settings._snapshot is not None and mtime == Settings._mtime:
+                return False
+
+            with open(SETTINGS_FILE, "r") as file:
+                json_data = yaml.safe_load(file) or {}
+
+            old = Settings._snapshot
+            Settings._snapshot = SettingsSnapshot.from_dict(json_data)
+            Settings._mtime = mtime
+
+        if old is not None:
+            logger.debug(f"Settings reloaded from {SETTINGS_FILE}")
+            for callback in list(Settings._subscribers):
+                try:
+                    callback(old, Settings._snapshot)
+                except Exception as e:
+                    logger.error(f"Settings subscriber {callback} failed: {e}")
+        return True
+
+    def subscribe(self, callback: Callable[[SettingsSnapshot, SettingsSnapshot], Any]) -> None:
+        """
+        Register a callback invoked as callback(old, new) after the settings file is reloaded.
+        """
+        if callback not in Settings._subscribers:
+            Settings._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[SettingsSnapshot, SettingsSnapshot], Any]) -> None:
+        if callback in Settings._subscribers:
+            Settings._subscribers.remove(callback)
+
+    def get(self, key: str, default=None):
+        """
+        Get a raw value from the settings file, for keys that have no typed field on SettingsSnapshot.
+        """
+        return self.snapshot.raw.get(key, default)
+
+    def get_range(self, key: str) -> tuple:
+        """
+        Get a {min, max} section as a (min, max) tuple.
+        """
+        return _range(self.snapshot.raw, key, "min"), _range(self.snapshot.raw, key, "max")
 
 
 # Configure the logger based on the settings
@@ -1,16 +1,32 @@
 import asyncio
 import random
 from datetime import datetime, timedelta
-from typing import List
+from typing import Callable
 
 from loguru import logger
 
 from data.settings import Settings
 from functions.controller import Controller
-from libs.eth_async.client import Client
+from functions.scheduler import DueScheduler
+from functions.sharded import run_sharded
+from libs.eth_async.chain_data import chain_data
+from libs.eth_async.client import clients
+from libs.eth_async.contract_cache import contract_cache
 from libs.eth_async.data.models import Networks
+from libs.eth_async.gas import gas_estimates
+from libs.eth_async.multicall import multicalls
+from libs.eth_async.receipts import receipt_trackers
+from libs.eth_async.signer import signer
+from libs.eth_async.transport import transports
 from utils.db_api.models import Wallet
-from utils.db_api.wallet_api import db, update_next_action_time, update_next_game_time
+from utils.db_api.wallet_api import (
+    count_wallets,
+    stream_wallets,
+    update_next_action_time,
+    update_next_game_time,
+    wallet_selection,
+    wallet_writes,
+)
 from utils.encryption import check_encrypt_param
 
 
@@ -22,32 +38,92 @@ async def random_sleep_before_start(wallet):
     await asyncio.sleep(random_sleep)
 
 
-async def execute(wallets: List[Wallet], task_func, random_pause_wallet_after_completion: int = 0):
-    while True:
-        semaphore = asyncio.Semaphore(min(len(wallets), Settings().threads))
+def configure_runtime() -> None:
+    signer.configure(backend=Settings().signer_backend, workers=Settings().signer_workers)
+    gas_estimates.configure(margin=Settings().gas_estimate_margin)
+    transports.configure(hedge=Settings().rpc_hedge, hedge_delay=Settings().rpc_hedge_delay)
+    multicalls.configure(isolate_proxies=Settings().isolate_proxies)
+    receipt_trackers.configure(isolate_proxies=Settings().isolate_proxies)
+
+
+def log_summaries() -> None:
+    logger.debug(transports.summary())
+    logger.debug(transports.report())
+    logger.debug(contract_cache.summary())
+    logger.debug(chain_data.summary())
+    logger.debug(signer.summary())
+    logger.debug(gas_estimates.summary())
+    logger.debug(clients.summary())
+    logger.debug(wallet_writes.summary())
+
+
+async def schedule(task_func, due_column, criterion: list | None = None):
+    """
+    Run the task for every selected wallet as its due time comes, until interrupted.
+    """
+    configure_runtime()
+    scheduler = DueScheduler(task_func=task_func, due_column=due_column, criterion=criterion, on_idle=log_summaries)
+    try:
+        await scheduler.run()
+
+    finally:
+        # write the buffered wallet updates before leaving
+        await wallet_writes.close()
+
+
+async def repeat(task_func, due_column, pause: int, criterion: list | None = None):
+    """
+    Run the task for every selected wallet once if no pause is configured, otherwise as its due time comes.
+    """
+    if pause == 0:
+        await execute(task_func, criterion=criterion)
+    else:
+        await schedule(task_func, due_column, criterion=criterion)
+
 
-        if Settings().shuffle_wallets:
-            random.shuffle(wallets)
+async def execute(task_func, criterion: list | None = None, random_pause_wallet_after_completion: int = 0):
+    """
+    Run the task for every selected wallet with Settings().threads workers. Wallets are streamed from the database into
+    a bounded queue, so memory use does not depend on the number of wallets.
+    """
+    configure_runtime()
+    threads = Settings().threads
+    try:
+        while True:
+            queue: asyncio.Queue[Wallet | None] = asyncio.Queue(maxsize=threads * 2)
 
-        async def sem_task(wallet: Wallet):
-            async with semaphore:
+            async def produce():
                 try:
-                    await task_func(wallet)
-                except Exception as e:
-                    logger.error(f"[{wallet.id}] failed: {e}")
+                    async for wallet in stream_wallets(*(criterion or []), shuffle=Settings().shuffle_wallets):
+                        await queue.put(wallet)
+                finally:
+                    for _ in range(threads):
+                        await queue.put(None)
+
+            async def work():
+                while (wallet := await queue.get()) is not None:
+                    try:
+                        await task_func(wallet)
+                    except Exception as e:
+                        logger.error(f"[{wallet.id}] failed: {e}")
 
-        tasks = [asyncio.create_task(sem_task(wallet)) for wallet in wallets]
-        await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.gather(produce(), *(work() for _ in range(threads)))
+            await wallet_writes.flush()
+            log_summaries()
 
-        if random_pause_wallet_after_completion == 0:
-            break
+            if random_pause_wallet_after_completion == 0:
+                break
 
-        # update dynamically the pause time
-        random_pause_wallet_after_completion = random.randint(60 * 1, 60 * 2)
+            # update dynamically the pause time
+            random_pause_wallet_after_completion = random.randint(60 * 1, 60 * 2)
 
-        next_run = datetime.now() + timedelta(seconds=random_pause_wallet_after_completion)
-        logger.info(f"Sleeping {random_pause_wallet_after_completion} seconds. Next run at: {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
-        await asyncio.sleep(random_pause_wallet_after_completion)
+            next_run = datetime.now() + timedelta(seconds=random_pause_wallet_after_completion)
+            logger.info(f"Sleeping {random_pause_wallet_after_completion} seconds. Next run at: {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
+            await asyncio.sleep(random_pause_wallet_after_completion)
+
+    finally:
+        # write the buffered wallet updates before leaving
+        await wallet_writes.close()
 
 
 async def activity(action: int):
@@ -55,43 +131,51 @@ async def activity(action: int):
         logger.error(f"Decryption Failed | Wrong Password")
         return
 
-    wallets = db.all(Wallet)
-    range_wallets = Settings().range_wallets_to_run
-    if range_wallets != [0, 0]:
-        start, end = range_wallets
-        wallets = [wallet for i, wallet in enumerate(wallets, start=1) if start <= i <= end]
+    criterion = wallet_selection(range_wallets=Settings().range_wallets_to_run, exact_wallets=Settings().exact_wallets_to_run)
+    wallets_count = await count_wallets(*criterion)
+
+    logger.info(f"Found {wallets_count} wallets for action")
+    if not wallets_count:
+        return
+
+    if Settings().processes > 1:
+        await run_sharded(action=action, processes=Settings().processes)
     else:
-        if Settings().exact_wallets_to_run:
-            wallets = [wallet for i, wallet in enumerate(wallets, start=1) if i in Settings().exact_wallets_to_run]
-
-    logger.info(f"Found {len(wallets)} wallets for action")
-    if action == 1 and wallets:
-        await execute(
-            wallets,
-            start_main_action,
-            random.randint(
-                Settings().random_pause_wallet_after_all_completion_min, Settings().random_pause_wallet_after_all_completion_max
-            ),
+        await run_action(action=action, criterion=criterion)
+
+
+async def run_action(action: int, criterion: list, track: Callable | None = None):
+    """
+    Run an action for the selected wallets in this process.
+
+    :param int action: the menu action number
+    :param list criterion: SQL criterion of the wallets to run
+    :param track: wraps the task function, e.g. to report progress of a shard (optional)
+    """
+    if track is None:
+        track = lambda task_func: task_func
+
+    if action == 1:
+        pause = random.randint(
+            Settings().random_pause_wallet_after_all_completion_min, Settings().random_pause_wallet_after_all_completion_max
         )
+        await repeat(track(start_main_action), Wallet.next_action_time, pause=pause, criterion=criterion)
 
-    if action == 2 and wallets:
-        await execute(
-            wallets,
-            complete_sprite_type_games,
-            random.randint(
-                Settings().random_pause_wallet_after_completion_sprite_types_game_min,
-                Settings().random_pause_wallet_after_completion_sprite_types_game_max,
-            ),
+    if action == 2:
+        pause = random.randint(
+            Settings().random_pause_wallet_after_completion_sprite_types_game_min,
+            Settings().random_pause_wallet_after_completion_sprite_types_game_max,
         )
+        await repeat(track(complete_sprite_type_games), Wallet.next_game_action_time, pause=pause, criterion=criterion)
 
-    if action == 3 and wallets:
-        await execute(wallets, complete_portal_games)
+    if action == 3:
+        await execute(track(complete_portal_games), criterion=criterion)
 
-    if action == 4 and wallets:
-        await execute(wallets, complete_galxe_quests)
+    if action == 4:
+        await execute(track(complete_galxe_quests), criterion=criterion)
 
-    if action == 5 and wallets:
-        await execute(wallets, complete_onchain_actions)
+    if action == 5:
+        await execute(track(complete_onchain_actions), criterion=criterion)
 
 
 async def start_main_action(wallet):
@@ -101,7 +185,7 @@ async def start_main_action(wallet):
 
     await random_sleep_before_start(wallet=wallet)
 
-    client = Client(private_key=wallet.private_key, proxy=wallet.proxy, network=Networks.Gravity)
+    client = clients.get(private_key=wallet.private_key, proxy=wallet.proxy, network=Networks.Gravity)
 
     controller = Controller(client=client, wallet=wallet)
 
@@ -120,7 +204,7 @@ async def start_main_action(wallet):
         Settings().random_pause_wallet_after_all_completion_min, Settings().random_pause_wallet_after_all_completion_max
     )
     next_time = now + timedelta(seconds=random_delay)
-    success_update = update_next_action_time(address=wallet.address, next_action_time=next_time)
+    success_update = await update_next_action_time(address=wallet.address, next_action_time=next_time)
     await controller.complete_galxe_quests()
     if success_update:
         logger.info(f"{wallet} Next action scheduled at {next_time}")
@@ -135,7 +219,7 @@ async def complete_sprite_type_games(wallet):
 
     await random_sleep_before_start(wallet=wallet)
 
-    client = Client(private_key=wallet.private_key, proxy=wallet.proxy, network=Networks.Gravity)
+    client = clients.get(private_key=wallet.private_key, proxy=wallet.proxy, network=Networks.Gravity)
 
     controller = Controller(client=client, wallet=wallet)
 
@@ -146,7 +230,7 @@ async def complete_sprite_type_games(wallet):
         Settings().random_pause_wallet_after_completion_sprite_types_game_max,
     )
     next_time = now + timedelta(seconds=random_delay)
-    success_update = update_next_game_time(address=wallet.address, next_game_action_time=next_time)
+    success_update = await update_next_game_time(address=wallet.address, next_game_action_time=next_time)
     if success_update:
         logger.info(f"{wallet} Next action scheduled at {next_time}")
     else:
@@ -156,7 +240,7 @@ async def complete_sprite_type_games(wallet):
 async def complete_portal_games(wallet):
     await random_sleep_before_start(wallet=wallet)
 
-    client = Client(private_key=wallet.private_key, proxy=wallet.proxy, network=Networks.Gravity)
+    client = clients.get(private_key=wallet.private_key, proxy=wallet.proxy, network=Networks.Gravity)
 
     controller = Controller(client=client, wallet=wallet)
 
@@ -166,7 +250,7 @@ async def complete_portal_games(wallet):
 async def complete_galxe_quests(wallet):
     await random_sleep_before_start(wallet=wallet)
 
-    client = Client(private_key=wallet.private_key, proxy=wallet.proxy, network=Networks.Gravity)
+    client = clients.get(private_key=wallet.private_key, proxy=wallet.proxy, network=Networks.Gravity)
 
     controller = Controller(client=client, wallet=wallet)
 
@@ -176,7 +260,7 @@ async def complete_galxe_quests(wallet):
 async def complete_onchain_actions(wallet):
     await random_sleep_before_start(wallet=wallet)
 
-    client = Client(private_key=wallet.private_key, proxy=wallet.proxy, network=Networks.Gravity)
+    client = clients.get(private_key=wallet.private_key, proxy=wallet.proxy, network=Networks.Gravity)
 
     controller = Controller(client=client, wallet=wallet)
 
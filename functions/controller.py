@@ -21,7 +21,7 @@ class Controller:
         self.base = Base(client=client, wallet=wallet)
         self.irys_client = Irys(client=client,wallet=wallet)
         self.quest_client = Quests(client=client,wallet=wallet)
-        self.irys_onchain = IrysOnchain(client=Client(private_key=self.client.account._private_key.hex(), network=Networks.Irys, proxy=self.wallet.proxy), wallet=wallet)
+        self.irys_onchain = IrysOnchain(client=client.on(Networks.Irys), wallet=wallet)
 
     async def complete_portal_games(self):
         if await self.irys_onchain.handle_balance():
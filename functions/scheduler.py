@@ -0,0 +1,153 @@
+import asyncio
+import heapq
+import random
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from loguru import logger
+from sqlalchemy import or_, select
+from sqlalchemy.orm import InstrumentedAttribute
+
+from data.settings import Settings
+from utils.db_api.models import Wallet
+from utils.db_api.wallet_api import adb, load_wallets, wallet_writes
+
+
+class DueScheduler:
+    """
+    Runs a wallet task whenever the wallet's due-time column (next_action_time or next_game_action_time) comes due.
+
+    Only due wallets are read, with an indexed query ordered by due time, and a task is created for them alone. Upcoming
+    deadlines are kept in a heap, and the scheduler sleeps until the nearest one, so an idle cycle costs one small query.
+    A wallet whose task did not move its due time forward (e.g. it failed early) is retried after 'retry_delay' seconds.
+    """
+
+    def __init__(
+        self,
+        task_func: Callable[[Wallet], Awaitable],
+        due_column: InstrumentedAttribute,
+        criterion: list | None = None,
+        threads: int | None = None,
+        retry_delay: tuple[int, int] = (60, 120),
+        max_idle: int = 600,
+        on_idle: Callable[[], None] | None = None,
+    ) -> None:
+        """
+        :param task_func: the coroutine function run for every due wallet
+        :param due_column: the Wallet column holding the due time
+        :param list | None criterion: SQL criterion of the wallets to run (all if None), see wallet_selection()
+        :param int | None threads: the maximum number of wallets run at once (Settings().threads if None)
+        :param tuple[int, int] retry_delay: the random pause before a wallet whose due time did not change is run again
+        :param int max_idle: the longest sleep without re-reading the database
+        :param on_idle: called every time all started wallets are done
+        """
+        self.task_func = task_func
+        self.due_column = due_column
+        self.criterion = criterion or []
+        self.semaphore = asyncio.Semaphore(threads or Settings().threads)
+        self.retry_delay = retry_delay
+        self.max_idle = max_idle
+        self.on_idle = on_idle
+        self.runs = 0
+        self._deadlines: list[tuple[datetime, int]] = []
+        self._deferred: dict[int, datetime] = {}
+        self._next_due: dict[int, datetime] = {}
+        self._running: dict[int, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+
+    def _filter(self, stmt):
+        return stmt.where(*self.criterion) if self.criterion else stmt
+
+    async def due_wallet_ids(self, now: datetime) -> list[int]:
+        stmt = self._filter(
+            select(Wallet.id).where(or_(self.due_column.is_(None), self.due_column <= now)).order_by(self.due_column, Wallet.id)
+        )
+        due = []
+        for wallet_id in await adb.all(stmt=stmt):
+            if wallet_id in self._running or wallet_id in self._deferred:
+                continue
+
+            # the new due time of a wallet that just finished may not be written yet (buffered or sent to the writer)
+            if self._next_due.get(wallet_id, now) > now:
+                continue
+
+            due.append(wallet_id)
+        return due
+
+    async def load_deadlines(self, now: datetime) -> None:
+        stmt = self._filter(select(Wallet.id, self.due_column).where(self.due_column > now))
+        async with adb.session() as session:
+            rows = (await session.execute(stmt)).all()
+        self._deadlines = [(due_time, wallet_id) for wallet_id, due_time in rows]
+        heapq.heapify(self._deadlines)
+
+    def _push(self, due_time: datetime, wallet_id: int) -> None:
+        heapq.heappush(self._deadlines, (due_time, wallet_id))
+        self._wakeup.set()
+
+    async def _run_wallet(self, wallet: Wallet) -> None:
+        wallet_id = wallet.id
+        try:
+            async with self.semaphore:
+                try:
+                    await self.task_func(wallet)
+                except Exception as e:
+                    logger.error(f"[{wallet.id}] failed: {e}")
+
+                self.runs += 1
+                due_time = getattr(wallet, self.due_column.key)
+                if due_time is None or due_time <= datetime.now():
+                    due_time = datetime.now() + timedelta(seconds=random.randint(*self.retry_delay))
+                    self._deferred[wallet_id] = due_time
+                self._next_due[wallet_id] = due_time
+                self._push(due_time, wallet_id)
+
+        finally:
+            self._running.pop(wallet_id, None)
+            if not self._running and self.on_idle is not None:
+                self.on_idle()
+
+    def _seconds_to_next_deadline(self, now: datetime) -> float:
+        passed = False
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, wallet_id = heapq.heappop(self._deadlines)
+            if self._deferred.get(wallet_id, now) <= now:
+                self._deferred.pop(wallet_id, None)
+            if self._next_due.get(wallet_id, now) <= now:
+                self._next_due.pop(wallet_id, None)
+            passed = True
+
+        if passed:
+            # some wallets came due since the last query
+            return 0
+        if not self._deadlines:
+            return self.max_idle
+        return min((self._deadlines[0][0] - now).total_seconds(), self.max_idle)
+
+    async def run(self) -> None:
+        await self.load_deadlines(datetime.now())
+        while True:
+            # due times written by finished wallets must be in the database before it is asked who is due
+            await wallet_writes.flush()
+            now = datetime.now()
+            due = await self.due_wallet_ids(now)
+            if due and Settings().shuffle_wallets:
+                random.shuffle(due)
+
+            # the due wallets are loaded with one query through the async engine; the session keeps only weak references,
+            # so every running task holds its wallet until it is done
+            wallets = await load_wallets(due) if due else {}
+            for wallet_id in due:
+                if wallet_id in wallets:
+                    self._running[wallet_id] = asyncio.create_task(self._run_wallet(wallets[wallet_id]))
+
+            if due:
+                logger.info(f"Started {len(due)} due wallets, {len(self._running)} running")
+
+            self._wakeup.clear()
+            sleep = self._seconds_to_next_deadline(datetime.now())
+            if sleep > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=sleep)
+                except asyncio.TimeoutError:
+                    pass
@@ -0,0 +1,257 @@
+import asyncio
+import itertools
+import multiprocessing
+import platform
+import time
+from collections import Counter
+from multiprocessing.process import BaseProcess
+
+from loguru import logger
+
+from data import config
+from data.settings import Settings
+from libs.eth_async.chain_data import chain_data
+from libs.eth_async.transport import transports
+from utils.db_api.models import Wallet
+from utils.db_api.wallet_api import adb, wallet_selection, wallet_writes
+
+PROGRESS_INTERVAL = 30
+WORKER_LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {process.name} | {name}:{function}:{line} - {message}"
+
+
+def _track(shard: int, progress: multiprocessing.Queue):
+    def wrap(task_func):
+        async def run(wallet: Wallet):
+            try:
+                await task_func(wallet)
+            except Exception:
+                progress.put((shard, False))
+                raise
+            progress.put((shard, True))
+
+        return run
+
+    return wrap
+
+
+class RowWriter:
+    """
+    Sends the row writes of a worker process (tx journal, allowances) to the main process and waits until they are
+    committed there, so a journal entry is still durable before its transaction is broadcast.
+    """
+
+    def __init__(self, shard: int, writes: multiprocessing.Queue, replies: multiprocessing.Queue) -> None:
+        self.shard = shard
+        self.writes = writes
+        self.replies = replies
+        self._ids = itertools.count()
+        self._calls: dict[int, asyncio.Future] = {}
+        self._reader: asyncio.Task | None = None
+
+    async def write_row(self, entity, values: dict, pk=None):
+        call_id = next(self._ids)
+        future = self._calls[call_id] = asyncio.get_running_loop().create_future()
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.ensure_future(self._read())
+
+        self.writes.put(("row", self.shard, call_id, entity, values, pk))
+        return await future
+
+    async def _read(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._calls:
+            call_id, result, error = await loop.run_in_executor(None, self.replies.get)
+            future = self._calls.pop(call_id, None)
+            if future is None or future.done():
+                continue
+
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+async def _shard_main(action: int, criterion: list, track) -> None:
+    from functions.activity import run_action
+
+    try:
+        await run_action(action=action, criterion=criterion, track=track)
+    finally:
+        await wallet_writes.close()
+        await transports.close_all()
+
+
+def _run_shard(
+    action: int,
+    shard: int,
+    shards: int,
+    cipher_suite,
+    writes: multiprocessing.Queue,
+    replies: multiprocessing.Queue,
+    progress: multiprocessing.Queue,
+    logs: multiprocessing.Queue,
+) -> None:
+    """
+    The entry point of a worker process: run the action for the wallets with id % shards == shard on a new event loop.
+    """
+    if platform.system() == "Windows":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    # the main process writes the log file and the console, records are sent to it
+    logger.remove()
+    logger.add(lambda message: logs.put((message.record["level"].name, str(message))), level="DEBUG", format=WORKER_LOG_FORMAT)
+
+    config.CIPHER_SUITE = cipher_suite
+    # all database writes go to the main process, which is the only writer
+    wallet_writes.sink = lambda batch: writes.put(("wallets", batch))
+    chain_data.sink = lambda namespace, key, value: writes.put(("chain_data", namespace, key, value))
+    adb.remote = RowWriter(shard=shard, writes=writes, replies=replies).write_row
+
+    criterion = wallet_selection(range_wallets=Settings().range_wallets_to_run, exact_wallets=Settings().exact_wallets_to_run)
+    criterion.append(Wallet.id % shards == shard)
+    try:
+        asyncio.run(_shard_main(action=action, criterion=criterion, track=_track(shard, progress)))
+    except KeyboardInterrupt:
+        pass
+
+
+class ShardedRunner:
+    """
+    Runs an action in several worker processes, each with its own event loop, RPC connections and signer, so CPU-bound
+    work (signing, ABI encoding, response formatting, logging) uses more than one core.
+
+    Every process owns the wallets with id % processes == its number. The main process is the only writer of the
+    databases: workers flush their buffered wallet updates and new chain data into a queue and the main process merges
+    them, journal and allowance rows are written by the main process on request of a worker, which waits for the commit.
+    Workers report every finished wallet to a progress queue and send their log records to the main process, which
+    logs the totals and writes the log file.
+    """
+
+    def __init__(self, action: int, processes: int) -> None:
+        self.action = action
+        self.processes = processes
+        self.context = multiprocessing.get_context("spawn")
+        self.writes = self.context.Queue()
+        self.replies = [self.context.Queue() for _ in range(processes)]
+        self.progress = self.context.Queue()
+        self.logs = self.context.Queue()
+        self.done = Counter()
+        self.failed = Counter()
+        self.batches = 0
+        self.rows = 0
+        self._workers: list[BaseProcess] = []
+
+    def start(self) -> None:
+        for shard in range(self.processes):
+            worker = self.context.Process(
+                target=_run_shard,
+                args=(
+                    self.action,
+                    shard,
+                    self.processes,
+                    config.CIPHER_SUITE,
+                    self.writes,
+                    self.replies[shard],
+                    self.progress,
+                    self.logs,
+                ),
+                name=f"shard-{shard}",
+                daemon=False,
+            )
+            worker.start()
+            self._workers.append(worker)
+        logger.info(f"Started {self.processes} worker processes")
+
+    async def _read(self, queue: multiprocessing.Queue, handle) -> None:
+        loop = asyncio.get_running_loop()
+        while (item := await loop.run_in_executor(None, queue.get)) is not None:
+            handle(item)
+
+    def _write(self, item: tuple) -> None:
+        kind = item[0]
+        if kind == "wallets":
+            self.batches += 1
+            wallet_writes.merge(item[1])
+        elif kind == "chain_data":
+            chain_data.set(*item[1:])
+        elif kind == "row":
+            asyncio.ensure_future(self._write_row(*item[1:]))
+
+    async def _write_row(self, shard: int, call_id: int, entity, values: dict, pk) -> None:
+        result = error = None
+        try:
+            result = await adb.write_row(entity, values, pk=pk)
+            self.rows += 1
+        except Exception as err:
+            # the original exception may not be picklable
+            error = RuntimeError(f"{type(err).__name__}: {err}")
+        self.replies[shard].put((call_id, result, error))
+
+    @staticmethod
+    def _log(item: tuple[str, str]) -> None:
+        level, message = item
+        logger.opt(raw=True).log(level, message)
+
+    def _count(self, item: tuple[int, bool]) -> None:
+        shard, success = item
+        (self.done if success else self.failed)[shard] += 1
+
+    def summary(self) -> str:
+        shards = " | ".join(f"{shard}: {self.done[shard]}/{self.failed[shard]}" for shard in range(self.processes))
+        return (
+            f"Shards progress: done {sum(self.done.values())} | failed {sum(self.failed.values())} | "
+            f"write batches: {self.batches} | rows: {self.rows} | per shard (done/failed): {shards}"
+        )
+
+    async def _report(self) -> None:
+        last = None
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            summary = self.summary()
+            if summary != last:
+                logger.info(summary)
+                last = summary
+
+    async def _wait_workers(self) -> None:
+        while any(worker.is_alive() for worker in self._workers):
+            await asyncio.sleep(1)
+
+    async def stop(self, timeout: float = 30) -> None:
+        """
+        Wait for the workers to finish (they flush their updates on exit), terminate the ones that do not, and write
+        everything that is still queued.
+        """
+        deadline = time.monotonic() + timeout
+        while any(worker.is_alive() for worker in self._workers) and time.monotonic() < deadline:
+            await asyncio.sleep(0.5)
+
+        for worker in self._workers:
+            if worker.is_alive():
+                logger.warning(f"Worker {worker.name} did not stop in {timeout}s, terminating")
+                worker.terminate()
+            worker.join()
+
+        for queue in (self.writes, self.progress, self.logs):
+            queue.put(None)
+
+    async def run(self) -> None:
+        self.start()
+        readers = [
+            asyncio.create_task(self._read(self.writes, self._write)),
+            asyncio.create_task(self._read(self.progress, self._count)),
+            asyncio.create_task(self._read(self.logs, self._log)),
+        ]
+        reporter = asyncio.create_task(self._report())
+        try:
+            await self._wait_workers()
+
+        finally:
+            reporter.cancel()
+            await asyncio.shield(self.stop())
+            await asyncio.gather(*readers, return_exceptions=True)
+            await wallet_writes.close()
+            logger.info(self.summary())
+
+
+async def run_sharded(action: int, processes: int) -> None:
+    await ShardedRunner(action=action, processes=processes).run()
@@ -1,20 +1,34 @@
 import asyncio
+import hashlib
 import random
-import time
 from dataclasses import dataclass
+from datetime import datetime, timedelta
 
 from eth_account.messages import _hash_eip191_message, encode_defunct, encode_typed_data
 from hexbytes import HexBytes
 from loguru import logger
 from web3.contract.async_contract import AsyncContract
 from web3.contract.contract import Contract
+from web3.exceptions import TimeExhausted
 from web3.types import TxParams
 
 from data.models import Contracts
 from libs.eth_async.client import Client
-from libs.eth_async.data.models import Networks, TokenAmount, TxArgs
+from libs.eth_async.contract_cache import contract_cache
+from libs.eth_async.data.models import CommonValues, Networks, TokenAmount, TxArgs
+from libs.eth_async.nonce import is_already_known, is_rejected
+from libs.eth_async.transactions import Tx
 from utils.browser import Browser
-from utils.db_api.models import Wallet
+from utils.db_api.models import Allowance, TxJournal, Wallet
+from utils.db_api.wallet_api import (
+    get_allowance,
+    get_open_journal_entry,
+    journal_replacement,
+    journal_tx,
+    set_allowance,
+    spend_allowance,
+    update_journal_status,
+)
 from utils.retry import async_retry
 
 
@@ -28,6 +42,7 @@ class TransactionResult:
 
 class Base:
     __module__ = "Web3 Base"
+    allowance_ttl = timedelta(hours=6)
 
     def __init__(self, client: Client, wallet: Wallet):
         self.client: Client = client
@@ -59,6 +74,13 @@ class Base:
         raise ValueError(f"Can not get {token_symbol + second_token} price from Binance")
 
     async def approve_interface(self, token_address, spender, amount: TokenAmount | None = None) -> bool:
+        """
+        Make sure the spender may spend the amount (the whole balance by default), approving it if needed.
+
+        Known allowances are kept in the DB: a stored allowance younger than 'allowance_ttl' that covers the amount is
+        trusted without reading the chain. The amount is deducted from the stored value right away, as the caller is
+        about to spend it.
+        """
         balance = await self.client.wallet.balance(token=token_address)
         if balance.Wei <= 0:
             return False
@@ -66,9 +88,19 @@ class Base:
         if not amount or amount.Wei > balance.Wei:
             amount = balance
 
-        approved = await self.client.transactions.approved_amount(token=token_address, spender=spender, owner=self.client.account.address)
+        token_address, _ = await self.client.contracts.get_contract_attributes(token_address)
+        spender, _ = await self.client.contracts.get_contract_attributes(spender)
+        key = dict(chain_id=self.client.network.chain_id, owner=self.client.account.address, token=token_address, spender=spender)
+
+        allowance = await get_allowance(**key)
+        if not allowance or allowance.wei < amount.Wei or datetime.now() - allowance.updated_at > self.allowance_ttl:
+            approved = await self.client.transactions.approved_amount(
+                token=token_address, spender=spender, owner=self.client.account.address
+            )
+            allowance = await set_allowance(**key, amount=approved.Wei)
 
-        if amount.Wei <= approved.Wei:
+        if amount.Wei <= allowance.wei:
+            await self.deduct_allowance(allowance, amount)
             return True
 
         # print(f'Trying to approve: {token_address} {amount.Ether} - {amount.Wei}')
@@ -77,10 +109,18 @@ class Base:
 
         receipt = await tx.wait_for_receipt(client=self.client, timeout=300)
         if receipt:
+            if receipt.get("status", 1):
+                await self.deduct_allowance(await set_allowance(**key, amount=amount.Wei), amount)
             return True
 
         return False
 
+    @staticmethod
+    async def deduct_allowance(allowance: Allowance, amount: TokenAmount) -> None:
+        # ERC-20 implementations do not decrease an infinite allowance
+        if allowance.wei != CommonValues.InfinityInt:
+            await spend_allowance(allowance, amount.Wei)
+
     async def get_token_info(self, contract_address):
         contract = await self.client.contracts.default_token(contract_address=contract_address)
         print("name:", await contract.functions.name().call())
@@ -126,22 +166,13 @@ class Base:
             return f"Balance Sender | Failed"
 
     async def wait_tx_status(self, tx_hash: HexBytes, max_wait_time=100) -> bool:
-        start_time = time.time()
-        while True:
-            try:
-                receipts = await self.client.w3.eth.get_transaction_receipt(tx_hash)
-                status = receipts.get("status")
-                if status == 1:
-                    return True
-                elif status is None:
-                    await asyncio.sleep(0.3)
-                else:
-                    return False
-            except BaseException:
-                if time.time() - start_time > max_wait_time:
-                    logger.exception(f"{self.client.account.address} получил неудачную транзакцию")
-                    return False
-                await asyncio.sleep(3)
+        try:
+            receipt = await self.client.receipts.wait(client=self.client, tx_hash=tx_hash, timeout=max_wait_time)
+        except TimeExhausted:
+            logger.exception(f"{self.client.account.address} получил неудачную транзакцию")
+            return False
+
+        return receipt.get("status") == 1
 
     async def wrap_eth(self, amount: TokenAmount = None):
         success_text = f"BASE | Wrap ETH | Success | {amount.Ether:.5f} ETH"
@@ -201,34 +232,99 @@ class Base:
         self,
         contract: AsyncContract | Contract,
     ):
-        module_contract = self.client.w3.eth.contract(
-            address=self.client.w3.to_checksum_address(contract.address),
-            abi=contract.abi,
-        )
-        balance = await module_contract.functions.balanceOf(self.client.account.address).call()
+        module_contract = contract_cache.get(w3=self.client.w3, address=contract.address, abi=contract.abi)
+        balance = await self.client.view(module_contract.functions.balanceOf(self.client.account.address))
 
         return balance
 
-    @async_retry()
-    async def execute_transaction(
-        self,
-        tx_params: TxParams,
-        activity_type: str = "unknown",
-        timeout: int = 180,
-    ) -> TransactionResult:
-        if "nonce" in tx_params:
-            tx_params["nonce"] = None
-
-        logger.info(f"{self.wallet} Executing {activity_type} transaction")
-        # Send transaction
-        tx = await self.client.transactions.sign_and_send(tx_params=tx_params)
+    def intent_key(self, tx_params: TxParams, activity_type: str) -> str:
+        """
+        Identify what a transaction is meant to do, so that retries of the same action find its journaled transaction.
+        """
+        payload = f"{tx_params.get('to')}|{tx_params.get('data') or '0x'}|{int(tx_params.get('value') or 0)}".lower()
+        digest = hashlib.sha1(payload.encode()).hexdigest()[:16]
+        return f"{self.client.network.chain_id}:{self.client.account.address}:{activity_type}:{digest}"
+
+    async def _find_journaled_receipt(self, entry: TxJournal) -> Tx | None:
+        for tx_hash in entry.hashes:
+            receipt = await self.client.transactions.get_receipt(tx_hash)
+            if receipt:
+                tx = Tx(tx_hash=tx_hash)
+                tx.receipt = receipt
+                return tx
+
+        return None
+
+    async def _journaled_nonce_used(self, entry: TxJournal) -> bool:
+        nonce = await self.client.w3.eth.get_transaction_count(self.client.account.address, "latest")
+        return nonce > entry.nonce
+
+    async def resume_journaled_tx(self, entry: TxJournal) -> Tx | None:
+        """
+        Continue an unfinished journaled transaction instead of signing a new one.
+
+        The entry is marked dropped when the node rejects the re-broadcast (its nonce is used, the fees are below the
+        base fee, the funds are insufficient) or the account nonce is past it, so the intent is signed again with fresh
+        fees. Transport errors and rate limits are raised and the entry stays open, so a retry broadcasts it again
+        instead of signing a duplicate.
+
+        :return Tx | None: the mined or re-broadcast transaction, or None if it can no longer be mined
+        """
+        tx = await self._find_journaled_receipt(entry)
+        if tx is not None:
+            return tx
+
+        try:
+            await self.client.w3.eth.send_raw_transaction(transaction=HexBytes(entry.raw_tx))
+
+        except Exception as err:
+            if not is_already_known(err):
+                if not is_rejected(err) and not await self._journaled_nonce_used(entry):
+                    raise
+
+                # this raw transaction will not be accepted again, unless it was mined meanwhile
+                tx = await self._find_journaled_receipt(entry)
+                if tx is not None:
+                    return tx
+
+                logger.debug(f"{self.wallet} journaled tx {entry.tx_hash} dropped: {err}")
+                await update_journal_status(entry, status="dropped")
+                return None
+
+        logger.info(f"{self.wallet} resuming journaled transaction {entry.tx_hash}")
+        await update_journal_status(entry, status="sent")
+        return Tx(tx_hash=entry.tx_hash, raw_transaction=HexBytes(entry.raw_tx))
+
+    async def journal_signed(self, intent_key: str, signed: Tx) -> TxJournal:
+        return await journal_tx(
+            intent_key=intent_key,
+            chain_id=self.client.network.chain_id,
+            address=self.client.account.address,
+            nonce=signed.params["nonce"],
+            tx_hash=signed.hash.hex(),
+            raw_tx=signed.raw_transaction.hex(),
+        )
 
-        # Wait for confirmation
-        receipt = await tx.wait_for_receipt(self.client, timeout=timeout)
+    async def confirm_journaled_tx(self, tx: Tx, entry: TxJournal, timeout: int = 180) -> TransactionResult:
+        """
+        Wait for a journaled transaction to be mined and record the outcome in the journal.
+        """
+        # Wait for confirmation, replacing the tx with bumped fees while it is stuck. On TimeExhausted the journal entry
+        # stays open: the retry checks its receipt or re-broadcasts it before signing anything new
+        if tx.receipt is None:
+            tx = await self.client.transactions.wait_for_inclusion(
+                tx,
+                timeout=timeout,
+                on_replaced=lambda replacement: journal_replacement(
+                    entry, tx_hash=replacement.hash.hex(), raw_tx=replacement.raw_transaction.hex()
+                ),
+            )
 
-        if receipt and tx.params:
+        receipt = tx.receipt
+        if receipt:
             # Check status
             status = receipt.get("status", 1)
+            await update_journal_status(entry, status="reverted" if status == 0 else "mined", tx_hash=tx.hash.hex())
             if status == 0:
                 return TransactionResult(
                     success=False,
@@ -247,3 +343,102 @@ class Base:
                 success=False,
                 error_message="Transaction receip timeout" or "Unknown error",
             )
+
+    @async_retry()
+    async def execute_transaction(
+        self,
+        tx_params: TxParams,
+        activity_type: str = "unknown",
+        timeout: int = 180,
+    ) -> TransactionResult:
+        intent_key = self.intent_key(tx_params, activity_type)
+        entry = await get_open_journal_entry(intent_key)
+        tx = await self.resume_journaled_tx(entry) if entry else None
+
+        if tx is None:
+            if "nonce" in tx_params:
+                tx_params["nonce"] = None
+
+            journaled: TxJournal | None = None
+
+            async def journal(signed: Tx) -> None:
+                nonlocal journaled
+                journaled = await self.journal_signed(intent_key, signed)
+
+            logger.info(f"{self.wallet} Executing {activity_type} transaction")
+            # Send transaction, journaling it before the broadcast so a retry can find it
+            try:
+                tx = await self.client.transactions.sign_and_send(tx_params=tx_params, on_signed=journal)
+            except Exception as err:
+                if journaled is not None and is_rejected(err):
+                    # the node refused it and its nonce is released, the retry signs the intent again with fresh fees
+                    await update_journal_status(journaled, status="dropped")
+                raise
+
+            entry = journaled
+            await update_journal_status(entry, status="sent")
+
+        return await self.confirm_journaled_tx(tx, entry, timeout=timeout)
+
+    async def execute_transactions(self, transactions: list[tuple[TxParams, str]], timeout: int = 180) -> list[TransactionResult]:
+        """
+        Send independent transactions back-to-back with consecutive nonces and wait for all of them together.
+
+        Like execute_transaction(), every transaction is journaled before its broadcast and the call is retried on errors;
+        a retry resumes the journaled transactions and sends only the ones that are not confirmed yet.
+
+        :param list[tuple[TxParams, str]] transactions: (tx params, activity type) pairs in the order they must be mined
+        :param int timeout: the receipt waiting timeout
+        :return list[TransactionResult]: the results in the input order
+        """
+        results: list[TransactionResult | None] = [None] * len(transactions)
+        await self._execute_unconfirmed(transactions, results, timeout=timeout)
+        return results
+
+    @async_retry()
+    async def _execute_unconfirmed(self, transactions: list[tuple[TxParams, str]], results: list, timeout: int) -> None:
+        pending = [i for i, result in enumerate(results) if result is None]
+        intent_keys = {i: self.intent_key(transactions[i][0], transactions[i][1]) for i in pending}
+        entries = {i: await get_open_journal_entry(intent_keys[i]) for i in pending}
+        txs = {i: await self.resume_journaled_tx(entries[i]) if entries[i] else None for i in pending}
+
+        new = [i for i in pending if txs[i] is None]
+        if new:
+            for i in new:
+                logger.info(f"{self.wallet} Executing {transactions[i][1]} transaction")
+
+            journaled = set()
+
+            async def journal(index: int, signed: Tx) -> None:
+                entries[new[index]] = await self.journal_signed(intent_keys[new[index]], signed)
+                journaled.add(new[index])
+
+            # journaled before the broadcast, so a retry finds them
+            sent = await self.client.transactions.send_many(
+                [transactions[i][0] for i in new], wait=False, timeout=timeout, on_signed=journal
+            )
+            for i, tx in zip(new, sent):
+                txs[i] = tx
+                if isinstance(tx, Tx):
+                    await update_journal_status(entries[i], status="sent")
+                elif i in journaled and is_rejected(tx):
+                    await update_journal_status(entries[i], status="dropped")
+
+        sent = [i for i in pending if isinstance(txs[i], Tx)]
+        confirmed = await asyncio.gather(
+            *(self.confirm_journaled_tx(txs[i], entries[i], timeout=timeout) for i in sent), return_exceptions=True
+        )
+        outcomes = dict(zip(sent, confirmed))
+
+        error: BaseException | None = None
+        for i in pending:
+            outcome = outcomes.get(i, txs[i])
+            if isinstance(outcome, TransactionResult):
+                results[i] = outcome
+                continue
+
+            logger.error(f"{self.wallet} {transactions[i][1]} transaction failed: {outcome}")
+            error = error or outcome
+
+        if error is not None:
+            raise error
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+from typing import TYPE_CHECKING, Any, Callable
+
+from aiohttp import ClientResponseError
+from web3._utils.method_formatters import get_error_formatters, get_request_formatters, get_result_formatters
+from web3._utils.rpc_abi import RPC
+from web3.types import BlockIdentifier, TxParams
+
+from . import exceptions
+from .data import types
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .transport import RPCTransport
+
+
+_request_ids = itertools.count(1)
+
+
+class BatchCall:
+    """
+    A single JSON-RPC call queued in a BatchRequest.
+
+    Attributes:
+        id (int): the JSON-RPC request id.
+        method (str): the JSON-RPC method.
+        params (list): the formatted request params.
+        future (asyncio.Future): resolved with the formatted result once the batch is sent.
+
+    """
+
+    def __init__(self, method: str, params: list | tuple, formatter: Callable[[Any], Any] | None = None) -> None:
+        self.id = next(_request_ids)
+        self.method = method
+        self.params = list(get_request_formatters(method)(params))
+        self.formatter = formatter
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def payload(self) -> dict:
+        return {"jsonrpc": "2.0", "id": self.id, "method": self.method, "params": self.params}
+
+    def resolve(self, response: dict) -> None:
+        if self.future.done():
+            return
+
+        try:
+            if response.get("error"):
+                get_error_formatters(self.method)(response)
+                raise exceptions.RPCError(response["error"])
+
+            result = get_result_formatters(self.method, None)(response.get("result"))
+            if self.formatter:
+                result = self.formatter(result)
+            self.future.set_result(result)
+
+        except Exception as err:
+            self.future.set_exception(err)
+
+
+class BatchRequest:
+    """
+    Collects JSON-RPC calls and sends them to the client endpoint as one JSON-RPC array.
+
+    Every queued call returns an asyncio.Future that is resolved when the batch is sent, i.e. when the
+    'async with client.batch()' block exits or execute() is awaited. Results are formatted the same way web3 formats them.
+    If the endpoint rejects batches, the calls are sent one by one and the endpoint is remembered as not supporting batches.
+
+    Example:
+        async with client.batch() as batch:
+            nonce = batch.get_transaction_count()
+            gas_price = batch.gas_price()
+
+        print(nonce.result(), gas_price.result())
+
+    """
+
+    def __init__(self, client: Client) -> None:
+        self.client = client
+        self.calls: list[BatchCall] = []
+
+    @property
+    def transport(self) -> RPCTransport:
+        return self.client.transport
+
+    async def __aenter__(self) -> BatchRequest:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            await self.execute()
+        else:
+            for call in self.calls:
+                call.future.cancel()
+
+    def add(self, method: str, params: list | tuple = (), formatter: Callable[[Any], Any] | None = None) -> asyncio.Future:
+        """
+        Queue a JSON-RPC call.
+
+        :param str method: the JSON-RPC method, e.g. 'eth_getBalance'
+        :param list | tuple params: the call params in web3 (pythonic) form
+        :param Callable | None formatter: an extra formatter applied to the web3-formatted result
+        :return asyncio.Future: the future result
+        """
+        call = BatchCall(method=method, params=params, formatter=formatter)
+        self.calls.append(call)
+        return call.future
+
+    def get_balance(self, address: types.Address | None = None, block: BlockIdentifier = "latest") -> asyncio.Future:
+        return self.add(RPC.eth_getBalance, (address or self.client.account.address, block))
+
+    def get_transaction_count(self, address: types.Address | None = None, block: BlockIdentifier = "latest") -> asyncio.Future:
+        return self.add(RPC.eth_getTransactionCount, (address or self.client.account.address, block))
+
+    def gas_price(self) -> asyncio.Future:
+        return self.add(RPC.eth_gasPrice)
+
+    def max_priority_fee(self) -> asyncio.Future:
+        return self.add(RPC.eth_maxPriorityFeePerGas)
+
+    def block_number(self) -> asyncio.Future:
+        return self.add(RPC.eth_blockNumber)
+
+    def get_block(self, block: BlockIdentifier = "latest", full_transactions: bool = False) -> asyncio.Future:
+        method = RPC.eth_getBlockByHash if isinstance(block, bytes) or str(block).startswith("0x") else RPC.eth_getBlockByNumber
+        return self.add(method, (block, full_transactions))
+
+    def estimate_gas(self, tx_params: TxParams) -> asyncio.Future:
+        return self.add(RPC.eth_estimateGas, (tx_params,))
+
+    def call(self, tx_params: TxParams, block: BlockIdentifier = "latest") -> asyncio.Future:
+        return self.add(RPC.eth_call, (tx_params, block))
+
+    def get_transaction_receipt(self, tx_hash: str | bytes) -> asyncio.Future:
+        return self.add(RPC.eth_getTransactionReceipt, (tx_hash,))
+
+    async def execute(self) -> list[Any]:
+        """
+        Send all queued calls.
+
+        :return list[Any]: results in the order the calls were queued (exceptions are returned in place of failed calls)
+        """
+        calls, self.calls = self.calls, []
+        if not calls:
+            return []
+
+        if len(calls) == 1 or self.transport.supports_batch is False:
+            await self._send_single(calls)
+        else:
+            await self._send_batch(calls)
+
+        return [call.future.exception() or call.future.result() for call in calls]
+
+    async def _send_batch(self, calls: list[BatchCall]) -> None:
+        try:
+            responses = await self.transport.request_json(payload=[call.payload() for call in calls], headers=self.client.headers)
+
+        except ClientResponseError as err:
+            if 400 <= err.status < 500 and err.status != 429:
+                self.transport.supports_batch = False
+                return await self._send_single(calls)
+            return self._fail(calls, err)
+
+        except Exception as err:
+            return self._fail(calls, err)
+
+        if not isinstance(responses, list):
+            self.transport.supports_batch = False
+            return await self._send_single(calls)
+
+        self.transport.supports_batch = True
+        by_id = {response.get("id"): response for response in responses if isinstance(response, dict)}
+        missing = []
+        for call in calls:
+            response = by_id.get(call.id)
+            if response is None:
+                missing.append(call)
+            else:
+                call.resolve(response)
+
+        if missing:
+            await self._send_single(missing)
+
+    async def _send_single(self, calls: list[BatchCall]) -> None:
+        async def send(call: BatchCall) -> None:
+            try:
+                call.resolve(await self.transport.request_json(payload=call.payload(), headers=self.client.headers))
+            except Exception as err:
+                call.future.set_exception(err)
+
+        await asyncio.gather(*(send(call) for call in calls))
+
+    @staticmethod
+    def _fail(calls: list[BatchCall], err: Exception) -> None:
+        for call in calls:
+            if not call.future.done():
+                call.future.set_exception(err)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+from hexbytes import HexBytes
+from loguru import logger
+from web3 import Web3
+from web3._utils.method_formatters import get_result_formatters
+from web3._utils.rpc_abi import RPC
+
+from data.config import CHAIN_DATA_DB
+
+
+def receipt_key(chain_id: int, tx_hash: str | bytes) -> str:
+    return f"{chain_id}:{Web3.to_hex(HexBytes(tx_hash))}"
+
+
+def dump_receipt(receipt: dict) -> dict:
+    """
+    Convert a web3-formatted receipt to plain JSON types.
+    """
+    return json.loads(Web3.to_json(receipt))
+
+
+def load_receipt(data: dict) -> dict:
+    """
+    Format a receipt loaded from the cache the same way web3 formats RPC responses.
+    """
+    return dict(get_result_formatters(RPC.eth_getTransactionReceipt, None)(data))
+
+
+class ImmutableCache:
+    """
+    A persistent key-value cache for chain data that can never change: token decimals, receipts of finalized
+    transactions and the like.
+
+    Values are JSON-serializable and grouped by namespace. Lookups hit a bounded in-memory LRU first and the SQLite file
+    second, so after the first run the data is read without RPC calls. The database is opened on first use; if it can
+    not be opened, the cache keeps working in memory only.
+
+    If 'sink' is set (in a worker process of the sharded runner), new values are handed to it instead of the database
+    and the process owning the database stores them.
+    """
+
+    def __init__(self, path: str, memory_size: int = 10_000) -> None:
+        self.path = path
+        self.memory_size = memory_size
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[tuple[str, str], Any] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        self._disabled = False
+        self._lock = threading.Lock()
+        self.sink: Callable[[str, str, Any], None] | None = None
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if self._conn is None and not self._disabled:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS immutable_cache (namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                    "PRIMARY KEY (namespace, key))"
+                )
+
+            except sqlite3.Error as err:
+                logger.warning(f"Immutable cache works in memory only: {err}")
+                self._conn = None
+                self._disabled = True
+
+        return self._conn
+
+    def _remember(self, key: tuple[str, str], value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        """
+        Get a cached value.
+
+        :param str namespace: the kind of data, e.g. 'decimals'
+        :param str key: the key within the namespace, e.g. '<chain id>:<token address>'
+        :return Any | None: the value or None if it is not cached
+        """
+        memory_key = (namespace, key)
+        if memory_key in self._memory:
+            self.memory_hits += 1
+            self._memory.move_to_end(memory_key)
+            return self._memory[memory_key]
+
+        with self._lock:
+            conn = self._connect()
+            row = None
+            if conn is not None:
+                row = conn.execute("SELECT value FROM immutable_cache WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        value = json.loads(row[0])
+        self._remember(memory_key, value)
+        return value
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        """
+        Cache a value forever.
+        """
+        self._remember((namespace, key), value)
+        if self.sink is not None:
+            self.sink(namespace, key, value)
+            return
+
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO immutable_cache (namespace, key, value) VALUES (?, ?, ?)", (namespace, key, json.dumps(value))
+                )
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._memory.pop((namespace, key), None)
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                conn.execute("DELETE FROM immutable_cache WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def summary(self) -> str:
+        return f"Immutable cache: memory hits: {self.memory_hits} | disk hits: {self.disk_hits} | misses: {self.misses}"
+
+
+chain_data = ImmutableCache(path=CHAIN_DATA_DB)
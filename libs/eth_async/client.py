@@ -1,5 +1,8 @@
+import copy
 import random
 import re
+import time
+from typing import Any
 
 import requests
 from eth_account.signers.local import LocalAccount
@@ -10,9 +13,16 @@ from web3.eth import AsyncEth
 from utils.encryption import get_private_key
 
 from . import exceptions
+from .batch import BatchRequest
 from .contracts import Contracts
 from .data.models import Network, Networks
+from .fees import FeeOracle, fee_oracles
+from .multicall import Multicall, multicalls
+from .nonce import NonceManager, nonces
+from .receipts import ReceiptTracker, receipt_trackers
+from .signer import signer
 from .transactions import Transactions
+from .transport import EndpointPool, RPCTransport, transports
 from .wallet import Wallet
 
 
@@ -42,45 +52,174 @@ class Client:
                 if not your_ip:
                     raise exceptions.InvalidProxy(f"Proxy doesn't work! Your IP is {your_ip}.")
 
-        self.w3 = Web3(
-            provider=Web3.AsyncHTTPProvider(
-                endpoint_uri=self.network.rpc, request_kwargs={"proxy": self.proxy, "headers": self.headers, "timeout": 360}
-            ),
-            modules={"eth": (AsyncEth,)},
-            middlewares=[],
-        )
+        self.w3 = self._make_w3()
 
         if private_key is None:
             self.account = self.w3.eth.account.create(extra_entropy=str(random.randint(1, 999_999_999)))
         elif re.match(r"^gAAAA", private_key):
-            self.account = self.w3.eth.account.from_key(get_private_key(private_key))
+            self.account = signer.derive_account(get_private_key(private_key))
         else:
-            self.account = self.w3.eth.account.from_key(private_key=private_key)
+            self.account = signer.derive_account(private_key)
 
         self.wallet = Wallet(self)
         self.contracts = Contracts(self)
         self.transactions = Transactions(self)
+        self._networks: dict[str, Client] = {network.name: self}
 
-    async def switch_network(self, new_network: Network) -> None:
+    def _make_w3(self) -> Web3:
+        return Web3(
+            provider=transports.provider(endpoint_uri=self.network.rpcs, proxy=self.proxy, headers=self.headers),
+            modules={"eth": (AsyncEth,)},
+            middlewares=[],
+        )
+
+    @property
+    def transport(self) -> RPCTransport | EndpointPool:
+        """
+        The pooled transport (or endpoint pool, if the network has several RPCs) shared by all clients with the same RPC and proxy.
         """
+        return self.w3.provider.transport
 
-        :param new_network:
-        :return:
+    @property
+    def multicall(self) -> Multicall:
         """
+        The Multicall3 aggregator shared by all clients with the same RPC and proxy (the same RPC without proxy isolation).
+        """
+        return multicalls.get(self)
 
-        self.network = new_network
+    async def view(self, function) -> Any:
+        """
+        Call a view contract function through the Multicall3 aggregator, e.g. client.view(contract.functions.balanceOf(address)).
+        """
+        return await self.multicall.call_function(client=self, function=function)
 
-        self.w3 = Web3(
-            provider=Web3.AsyncHTTPProvider(endpoint_uri=self.network.rpc, request_kwargs={"proxy": self.proxy, "headers": self.headers}),
-            modules={"eth": (AsyncEth,)},
-            middlewares=[],
-        )
+    @property
+    def nonce_manager(self) -> NonceManager:
+        """
+        The local nonce allocator of this account on the current network.
+        """
+        return nonces.get(chain_id=self.network.chain_id, address=self.account.address)
+
+    @property
+    def fee_oracle(self) -> FeeOracle:
+        """
+        The fee oracle shared by all clients on the current network.
+        """
+        return fee_oracles.get(self.network)
+
+    @property
+    def receipts(self) -> ReceiptTracker:
+        """
+        The receipt tracker shared by all clients with the same RPC and proxy (the same RPC without proxy isolation).
+        """
+        return receipt_trackers.get(self)
+
+    def on(self, network: Network) -> "Client":
+        """
+        Get the client of the same account on another network.
+
+        The clients of one account share the account, proxy, headers and the map of networks; the provider, Wallet,
+        Contracts and Transactions of a network are created on the first call and reused afterwards, e.g.
+        client.on(Networks.Irys).wallet.balance().
 
-        if self.account:
-            private_key = self.account.key
-            self.account = self.w3.eth.account.from_key(private_key=private_key)
+        :param Network network: the network
+        :return Client: the client on the network
+        """
+        client = self._networks.get(network.name)
+        if client is None:
+            client = copy.copy(self)
+            client.network = network
+            client.w3 = client._make_w3()
+            client.wallet = Wallet(client)
+            client.contracts = Contracts(client)
+            client.transactions = Transactions(client, fee_strategy=self.transactions.fee_strategy)
+            self._networks[network.name] = client
+        return client
+
+    def batch(self) -> BatchRequest:
+        """
+        Start a JSON-RPC batch: calls queued inside 'async with client.batch() as batch:' are sent in one HTTP request.
+        """
+        return BatchRequest(client=self)
+
+    async def switch_network(self, new_network: Network) -> None:
+        """
+        Move this client to another network. Prefer client.on(network), which keeps the client of every network.
+
+        :param Network new_network: the network
+        """
+        if self._networks.get(self.network.name) is self:
+            del self._networks[self.network.name]
+
+        self.network = new_network
+        self.w3 = self._make_w3()
+        self._networks[new_network.name] = self
 
     async def get_chain_tx_count(self):
         txn = await self.w3.eth.get_transaction_count(account=self.account.address)
 
         return txn
+
+
+class ClientRegistry:
+    """
+    Keeps one Client per (private key, proxy) for the life of the process; other networks are attached with Client.on().
+
+    Scheduler loops ask the registry instead of building a Client on every pass, so the account, Web3 instances, user
+    agent and helper objects of a wallet are created once. Clients unused for longer than 'max_idle' seconds (by default longer
+    than the longest default pause between cycles) are dropped; the check runs at most once per 'evict_interval' seconds.
+    """
+
+    def __init__(self, max_idle: float = 26 * 3600, evict_interval: float = 60) -> None:
+        self.max_idle = max_idle
+        self.evict_interval = evict_interval
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self._clients: dict[tuple[str, str | None], tuple[Client, float]] = {}
+        self._evicted_at = time.monotonic()
+
+    def get(self, private_key: str, network: Network = Networks.Sepolia, proxy: str | None = None) -> Client:
+        """
+        Get the client of a wallet on a network, creating it on first use.
+
+        :param str private_key: the private key (plain or encrypted)
+        :param Network network: the network
+        :param str | None proxy: the wallet proxy
+        :return Client: the client
+        """
+        now = time.monotonic()
+        if now - self._evicted_at >= self.evict_interval:
+            self.evict_idle()
+
+        key = (private_key, proxy)
+        entry = self._clients.get(key)
+        if entry is None:
+            client = Client(private_key=private_key, network=network, proxy=proxy)
+            self.created += 1
+        else:
+            client = entry[0]
+            self.reused += 1
+
+        self._clients[key] = (client, now)
+        return client.on(network)
+
+    def evict_idle(self) -> int:
+        """
+        Drop clients that were not requested for 'max_idle' seconds.
+
+        :return int: the number of dropped clients
+        """
+        now = time.monotonic()
+        self._evicted_at = now
+        idle = [key for key, (_, last_used) in self._clients.items() if now - last_used > self.max_idle]
+        for key in idle:
+            del self._clients[key]
+        self.evicted += len(idle)
+        return len(idle)
+
+    def summary(self) -> str:
+        return f"Clients: {len(self._clients)} | created: {self.created} | reused: {self.reused} | evicted: {self.evicted}"
+
+
+clients = ClientRegistry()
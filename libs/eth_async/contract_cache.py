@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+
+from eth_typing import ChecksumAddress
+from web3 import AsyncWeb3, Web3
+from web3.contract import AsyncContract
+
+
+class ContractCache:
+    """
+    A bounded LRU cache of contract classes and instances.
+
+    w3.eth.contract() parses the ABI and builds a class for every function and event on each call. The cache keeps one
+    contract factory per ABI hash, shared by all Web3 instances, and one instance per (w3, address, ABI hash), so
+    repeated balance and allowance reads reuse the same objects. The factories are built against a provider-less Web3
+    and every instance is bound to the Web3 of its client. ABI hashes of the same list object are memoized by identity.
+    """
+
+    def __init__(self, max_factories: int = 256, max_instances: int = 4096) -> None:
+        self.max_factories = max_factories
+        self.max_instances = max_instances
+        self.hits = 0
+        self.misses = 0
+        self._factories: OrderedDict[tuple, type[AsyncContract]] = OrderedDict()
+        self._instances: OrderedDict[tuple, AsyncContract] = OrderedDict()
+        self._abi_keys: dict[int, tuple[list | str, str]] = {}
+        self._unbound_w3: AsyncWeb3 | None = None
+
+    def abi_key(self, abi: list | str) -> str:
+        """
+        Get a stable hash of an ABI.
+        """
+        memo = self._abi_keys.get(id(abi))
+        if memo is not None and memo[0] is abi:
+            return memo[1]
+
+        text = abi if isinstance(abi, str) else json.dumps(abi, sort_keys=True, separators=(",", ":"))
+        key = hashlib.sha1(text.encode()).hexdigest()
+        if len(self._abi_keys) >= self.max_factories:
+            self._abi_keys.clear()
+        # the ABI object is kept in the memo, so its id can not be reused by another object while the entry exists
+        self._abi_keys[id(abi)] = (abi, key)
+        return key
+
+    @staticmethod
+    def _lookup(cache: OrderedDict, key: tuple):
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    @staticmethod
+    def _store(cache: OrderedDict, key: tuple, value, limit: int) -> None:
+        cache[key] = value
+        if len(cache) > limit:
+            cache.popitem(last=False)
+
+    def _factory(self, abi: list | str) -> type[AsyncContract]:
+        """
+        Get the contract class of an ABI. Its class-level attributes use a Web3 without a provider, create instances
+        with get().
+        """
+        key = self.abi_key(abi)
+        factory = self._lookup(self._factories, key)
+        if factory is None:
+            if self._unbound_w3 is None:
+                self._unbound_w3 = AsyncWeb3()
+            factory = AsyncContract.factory(self._unbound_w3, abi=abi)
+            self._store(self._factories, key, factory, self.max_factories)
+        return factory
+
+    def get(self, w3: Web3, address: ChecksumAddress | str, abi: list | str) -> AsyncContract:
+        """
+        Get a contract instance.
+
+        :param Web3 w3: the Web3 instance the contract is bound to
+        :param ChecksumAddress | str address: the contract address
+        :param list | str abi: the contract ABI
+        :return AsyncContract: the contract instance
+        """
+        address = Web3.to_checksum_address(address)
+        key = (w3, address, self.abi_key(abi))
+        contract = self._lookup(self._instances, key)
+        if contract is not None:
+            self.hits += 1
+            return contract
+
+        self.misses += 1
+        factory = self._factory(abi=abi)
+        # bind the instance to the client's Web3, AsyncContract.__init__ builds its functions from self.w3
+        contract = factory.__new__(factory)
+        contract.w3 = w3
+        contract.__init__(address=address)
+        self._store(self._instances, key, contract, self.max_instances)
+        return contract
+
+    def clear(self) -> None:
+        self._factories.clear()
+        self._instances.clear()
+        self._abi_keys.clear()
+
+    def summary(self) -> str:
+        return (
+            f"Contract cache: {len(self._instances)} instances, {len(self._factories)} factories | "
+            f"hits: {self.hits} | misses: {self.misses}"
+        )
+
+
+contract_cache = ContractCache()
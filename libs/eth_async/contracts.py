@@ -6,6 +6,7 @@ from eth_typing import ChecksumAddress
 from web3 import Web3
 from web3.contract import AsyncContract, Contract
 
+from .contract_cache import contract_cache
 from .data import types
 from .data.models import DefaultABIs, RawContract
 from .utils.strings import text_between
@@ -26,8 +27,7 @@ class Contracts:
         :param ChecksumAddress | str contract_address: the contract address or instance of token.
         :return Contract | AsyncContract: the token contract instance.
         """
-        contract_address = Web3.to_checksum_address(contract_address)
-        return self.client.w3.eth.contract(address=contract_address, abi=DefaultABIs.Token)
+        return contract_cache.get(w3=self.client.w3, address=contract_address, abi=DefaultABIs.Token)
 
     @staticmethod
     async def get_signature(hex_signature: str) -> list | None:
@@ -109,6 +109,6 @@ class Contracts:
             abi = contract_abi
 
         if abi:
-            return self.client.w3.eth.contract(address=contract_address, abi=abi)
+            return contract_cache.get(w3=self.client.w3, address=contract_address, abi=abi)
 
         return self.client.w3.eth.contract(address=contract_address)
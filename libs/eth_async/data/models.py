@@ -1,38 +1,124 @@
+from __future__ import annotations
+
+import asyncio
 import json
+import threading
 from dataclasses import dataclass
 from decimal import Decimal
+from fractions import Fraction
 
 import requests
 from eth_typing import ChecksumAddress
 from web3 import Web3
 
+from data.config import CHAINS_CACHE_FILE
 from libs.eth_async import exceptions
 from libs.eth_async.blockscan_api import APIFunctions
 from libs.eth_async.classes import AutoRepr
 from libs.eth_async.data import config
+from libs.eth_async.utils.files import read_json, write_json
 
 
 class TokenAmount:
+    """
+    An amount of a token.
+
+    Only the integer amount in the smallest units ('Wei') and the token decimals are stored; 'Ether' and 'Gwei' are
+    computed on access. Amounts support +, - and comparison with other TokenAmount instances (integer operations on
+    'Wei' when the decimals match) and * and / by plain numbers.
+    """
+
+    __slots__ = ("Wei", "decimals")
+
     Wei: int
-    Ether: Decimal
     decimals: int
 
     def __init__(self, amount: int | float | str | Decimal, decimals: int = 18, wei: bool = False, gwei: bool = False) -> None:
         if wei:
-            self.Wei: int = int(amount)
-            self.Ether: Decimal = Decimal(str(amount)) / 10**decimals
-            self.Gwei: Decimal = self.Wei / Decimal(10**9)
+            self.Wei = int(amount)
         elif gwei:
-            self.Gwei: Decimal = Decimal(str(amount))
-            self.Wei: int = int(self.Gwei * 10**9)
-            self.Ether: Decimal = Decimal(self.Wei) / 10**decimals
+            self.Wei = int(amount * 10**9) if isinstance(amount, int) else int(Decimal(str(amount)) * 10**9)
         else:
-            self.Ether: Decimal = Decimal(str(amount))
-            self.Wei: int = int(self.Ether * 10**decimals)
-            self.Gwei: Decimal = self.Wei / Decimal(10**9)
+            self.Wei = int(amount * 10**decimals) if isinstance(amount, int) else int(Decimal(str(amount)) * 10**decimals)
 
         self.decimals = decimals
 
+    @classmethod
+    def from_wei(cls, wei: int, decimals: int = 18) -> TokenAmount:
+        amount = cls.__new__(cls)
+        amount.Wei = wei
+        amount.decimals = decimals
+        return amount
+
+    @property
+    def Ether(self) -> Decimal:
+        return Decimal(self.Wei) / 10**self.decimals
+
+    @property
+    def Gwei(self) -> Decimal:
+        return self.Wei / Decimal(10**9)
+
+    def _other_wei(self, other: TokenAmount) -> int:
+        if other.decimals == self.decimals:
+            return other.Wei
+        return int(Decimal(other.Wei) * 10**self.decimals / 10**other.decimals)
+
+    def __add__(self, other: TokenAmount) -> TokenAmount:
+        if not isinstance(other, TokenAmount):
+            return NotImplemented
+        return TokenAmount.from_wei(self.Wei + self._other_wei(other), self.decimals)
+
+    def __sub__(self, other: TokenAmount) -> TokenAmount:
+        if not isinstance(other, TokenAmount):
+            return NotImplemented
+        return TokenAmount.from_wei(self.Wei - self._other_wei(other), self.decimals)
+
+    def __mul__(self, other: int | float | Decimal) -> TokenAmount:
+        if isinstance(other, int):
+            return TokenAmount.from_wei(self.Wei * other, self.decimals)
+        if isinstance(other, (float, Decimal)):
+            return TokenAmount.from_wei(int(self.Wei * Decimal(str(other))), self.decimals)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: int | float | Decimal) -> TokenAmount:
+        if isinstance(other, (int, float, Decimal)):
+            return TokenAmount.from_wei(int(self.Wei / Decimal(str(other))), self.decimals)
+        return NotImplemented
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TokenAmount):
+            if other.decimals == self.decimals:
+                return self.Wei == other.Wei
+            # exact, so that equal amounts have equal hashes whatever the decimals
+            return self.Wei * 10**other.decimals == other.Wei * 10**self.decimals
+        return NotImplemented
+
+    def __lt__(self, other: TokenAmount) -> bool:
+        if isinstance(other, TokenAmount):
+            return self.Wei < (other.Wei if other.decimals == self.decimals else self._other_wei(other))
+        return NotImplemented
+
+    def __le__(self, other: TokenAmount) -> bool:
+        if isinstance(other, TokenAmount):
+            return self.Wei <= (other.Wei if other.decimals == self.decimals else self._other_wei(other))
+        return NotImplemented
+
+    def __gt__(self, other: TokenAmount) -> bool:
+        if isinstance(other, TokenAmount):
+            return self.Wei > (other.Wei if other.decimals == self.decimals else self._other_wei(other))
+        return NotImplemented
+
+    def __ge__(self, other: TokenAmount) -> bool:
+        if isinstance(other, TokenAmount):
+            return self.Wei >= (other.Wei if other.decimals == self.decimals else self._other_wei(other))
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        # the hash of the normalized value, as amounts with different decimals may be equal
+        return hash(Fraction(self.Wei, 10**self.decimals))
+
     def __str__(self):
         return f"{float(self.Ether):.5f}"
 
@@ -294,11 +380,72 @@ class API:
     functions: APIFunctions | None = None
 
 
+class ChainInfoCache:
+    """
+    A small on-disk cache of chain metadata (chain ids of RPC URLs, native coin symbols and decimals).
+    """
+
+    CHAIN_INFO_URL = "https://raw.githubusercontent.com/ethereum-lists/chains/master/_data/chains/eip155-{chain_id}.json"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._data: dict | None = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        if self._data is None:
+            try:
+                self._data = read_json(self.path)
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data
+
+    def get(self, key: str):
+        with self._lock:
+            return self._load().get(key)
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._load()[key] = value
+            try:
+                write_json(self.path, self._data, indent=2)
+            except OSError:
+                pass
+
+    def chain_id(self, rpc: str) -> int:
+        chain_id = self.get(f"rpc:{rpc}")
+        if chain_id is None:
+            chain_id = Web3(Web3.HTTPProvider(rpc, request_kwargs={"timeout": 30})).eth.chain_id
+            self.set(f"rpc:{rpc}", chain_id)
+        return chain_id
+
+    def native_currency(self, chain_id: int) -> dict:
+        currency = self.get(f"chain:{chain_id}")
+        if currency is None:
+            currency = requests.get(self.CHAIN_INFO_URL.format(chain_id=chain_id), timeout=30).json()["nativeCurrency"]
+            currency = {"symbol": currency["symbol"], "decimals": int(currency["decimals"])}
+            self.set(f"chain:{chain_id}", currency)
+        return currency
+
+
+chain_info_cache = ChainInfoCache(path=CHAINS_CACHE_FILE)
+
+
 class Network:
+    """
+    An EVM network.
+
+    'rpc' is one RPC URL or a list of interchangeable RPC URLs; with a list, requests are spread over the endpoints by
+    latency and fail over between them ('rpc' is then the first URL, 'rpcs' holds all of them).
+
+    'chain_id', 'coin_symbol' and 'decimals' may be omitted: they are resolved on first access (from the RPC and the
+    ethereum-lists registry) and stored in the chain info cache, so creating a Network never makes network calls.
+    """
+
     def __init__(
         self,
         name: str,
-        rpc: str,
+        rpc: str | list[str],
         decimals: int | None = None,
         chain_id: int | None = None,
         tx_type: int = 0,
@@ -307,42 +454,69 @@ class Network:
         api: API | None = None,
     ) -> None:
         self.name: str = name.lower()
-        self.rpc: str = rpc
-        self.chain_id: int | None = chain_id
+        self.rpcs: list[str] = [rpc] if isinstance(rpc, str) else list(rpc)
+        self.rpc: str = self.rpcs[0]
+        self._chain_id: int | None = chain_id
         self.tx_type: int = tx_type
-        self.coin_symbol: str | None = coin_symbol
+        self._coin_symbol: str | None = coin_symbol.upper() if coin_symbol else None
         self.explorer: str | None = explorer
-        self.decimals = decimals
+        self._decimals: int | None = decimals
         self.api = api
-        # todo: добавить поле decimals
 
-        if not self.chain_id:
-            try:
-                self.chain_id = Web3(Web3.HTTPProvider(self.rpc)).eth.chain_id
-            except Exception as err:
-                raise exceptions.WrongChainID(f"Can not get chain id: {err}")
+        self.set_api_functions()
 
-        if not self.coin_symbol or not self.decimals:
+    @property
+    def chain_id(self) -> int:
+        if not self._chain_id:
             try:
-                network = None
-                networks_info_response = requests.get("https://chainid.network/chains.json").json()
-                for network_ in networks_info_response:
-                    if network_["chainId"] == self.chain_id:
-                        network = network_
-                        break
-
-                if not self.coin_symbol:
-                    self.coin_symbol = network["nativeCurrency"]["symbol"]
-                if not self.decimals:
-                    self.decimals = int(network["nativeCurrency"]["decimals"])
-
+                self._chain_id = chain_info_cache.chain_id(self.rpc)
             except Exception as err:
-                raise exceptions.WrongCoinSymbol(f"Can not get coin symbol: {err}")
-
-        if self.coin_symbol:
-            self.coin_symbol = self.coin_symbol.upper()
-
-        self.set_api_functions()
+                raise exceptions.WrongChainID(f"Can not get chain id: {err}")
+        return self._chain_id
+
+    @chain_id.setter
+    def chain_id(self, value: int | None) -> None:
+        self._chain_id = value
+
+    def _resolve_native_currency(self) -> None:
+        try:
+            currency = chain_info_cache.native_currency(self.chain_id)
+            if not self._coin_symbol:
+                self._coin_symbol = currency["symbol"].upper()
+            if not self._decimals:
+                self._decimals = currency["decimals"]
+
+        except exceptions.WrongChainID:
+            raise
+
+        except Exception as err:
+            raise exceptions.WrongCoinSymbol(f"Can not get coin symbol: {err}")
+
+    @property
+    def coin_symbol(self) -> str:
+        if not self._coin_symbol:
+            self._resolve_native_currency()
+        return self._coin_symbol
+
+    @coin_symbol.setter
+    def coin_symbol(self, value: str | None) -> None:
+        self._coin_symbol = value.upper() if value else None
+
+    @property
+    def decimals(self) -> int:
+        if not self._decimals:
+            self._resolve_native_currency()
+        return self._decimals
+
+    @decimals.setter
+    def decimals(self, value: int | None) -> None:
+        self._decimals = value
+
+    async def resolve(self) -> None:
+        """
+        Resolve missing metadata in a worker thread, so the first access does not block the event loop.
+        """
+        await asyncio.to_thread(lambda: (self.chain_id, self.coin_symbol, self.decimals))
 
     def set_api_functions(self) -> None:
         """
@@ -388,6 +562,7 @@ class Networks:
         chain_id=8453,
         tx_type=2,
         coin_symbol="ETH",
+        decimals=18,
         explorer="https://base.blockscout.com/",
         api=API(key=config.BASE_API_KEY, url="https://api.basescan.org/api", docs="https://docs.basescan.org/"),
     )
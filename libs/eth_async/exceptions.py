@@ -14,6 +14,24 @@ class InvalidProxy(ClientException):
     pass
 
 
+class RPCError(ValueError):
+    """
+    A JSON-RPC error response. Subclasses ValueError, like the errors raised by web3 itself.
+    """
+
+    def __init__(self, error: dict | str) -> None:
+        super().__init__(error)
+        self.error = error
+
+    @property
+    def code(self) -> int | None:
+        return self.error.get("code") if isinstance(self.error, dict) else None
+
+    @property
+    def message(self) -> str:
+        return self.error.get("message", "") if isinstance(self.error, dict) else str(self.error)
+
+
 class TransactionException(Exception):
     pass
 
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from web3._utils.rpc_abi import RPC
+
+from .data.models import Network
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+@dataclass(frozen=True)
+class FeeStrategy:
+    """
+    An EIP-1559 fee strategy.
+
+    Attributes:
+        name (str): the strategy name.
+        percentile (int): the eth_feeHistory reward percentile used as the priority fee.
+        base_fee_multiplier (float): the headroom over the next block base fee in maxFeePerGas.
+
+    """
+
+    name: str
+    percentile: int
+    base_fee_multiplier: float
+
+
+class FeeStrategies:
+    Cheap = FeeStrategy(name="cheap", percentile=10, base_fee_multiplier=1.0)
+    Normal = FeeStrategy(name="normal", percentile=50, base_fee_multiplier=1.25)
+    Fast = FeeStrategy(name="fast", percentile=90, base_fee_multiplier=2.0)
+
+    @classmethod
+    def all(cls) -> tuple[FeeStrategy, ...]:
+        return cls.Cheap, cls.Normal, cls.Fast
+
+
+@dataclass(frozen=True)
+class FeeSuggestion:
+    """
+    Fee fields for a transaction. Legacy networks fill gas_price, EIP-1559 networks fill the max fee fields.
+    """
+
+    gas_price: int | None = None
+    max_fee_per_gas: int | None = None
+    max_priority_fee_per_gas: int | None = None
+
+    def as_tx_params(self) -> dict:
+        if self.gas_price is not None:
+            return {"gasPrice": self.gas_price}
+        return {"maxFeePerGas": self.max_fee_per_gas, "maxPriorityFeePerGas": self.max_priority_fee_per_gas}
+
+
+@dataclass(frozen=True)
+class ReplacementPolicy:
+    """
+    How stuck transactions are replaced.
+
+    Attributes:
+        stuck_blocks (int): how many new blocks a transaction may stay pending before it is replaced.
+        multiplier (float): the fee bump of every replacement; nodes require at least +10%, lower values are raised to it.
+        max_bumps (int): the maximum number of replacements of one transaction.
+
+    """
+
+    stuck_blocks: int = 3
+    multiplier: float = 1.125
+    max_bumps: int = 3
+
+    def bump(self, params: dict, market: FeeSuggestion) -> dict:
+        """
+        Get the fee fields of a replacement: the old fees bumped by the multiplier, or the current market fees if higher.
+        """
+        multiplier = max(self.multiplier, 1.1)
+        if params.get("maxFeePerGas") is not None:
+            priority_fee = max(math.ceil(params["maxPriorityFeePerGas"] * multiplier), market.max_priority_fee_per_gas or 0)
+            max_fee = max(math.ceil(params["maxFeePerGas"] * multiplier), market.max_fee_per_gas or 0, priority_fee)
+            return {"maxFeePerGas": max_fee, "maxPriorityFeePerGas": priority_fee}
+
+        return {"gasPrice": max(math.ceil(params["gasPrice"] * multiplier), market.gas_price or market.max_fee_per_gas or 0)}
+
+
+@dataclass
+class FeeSnapshot:
+    fetched_at: float
+    block_number: int | None = None
+    gas_price: int | None = None
+    base_fee: int | None = None
+    node_priority_fee: int | None = None
+    rewards: dict[int, int] = field(default_factory=dict)
+
+
+class FeeOracle:
+    """
+    Fee data of one network, shared by all clients on it.
+
+    The data is refreshed at most once per 'ttl' seconds (roughly a block time) with a single JSON-RPC batch; concurrent
+    callers wait for the same refresh. Legacy networks (Network.tx_type 0) use eth_gasPrice, EIP-1559 networks use
+    eth_feeHistory percentiles and fall back to the latest base fee plus eth_maxPriorityFeePerGas.
+    """
+
+    def __init__(self, network: Network, ttl: float = 3.0, history_blocks: int = 10) -> None:
+        self.network = network
+        self.ttl = ttl
+        self.history_blocks = history_blocks
+        self.hits = 0
+        self.refreshes = 0
+        self._snapshot: FeeSnapshot | None = None
+        self._refreshing: asyncio.Future | None = None
+
+    @property
+    def percentiles(self) -> list[int]:
+        return sorted({strategy.percentile for strategy in FeeStrategies.all()})
+
+    async def snapshot(self, client: Client) -> FeeSnapshot:
+        if self._snapshot and time.monotonic() - self._snapshot.fetched_at < self.ttl:
+            self.hits += 1
+            return self._snapshot
+
+        if self._refreshing is not None:
+            self.hits += 1
+            return await asyncio.shield(self._refreshing)
+
+        self._refreshing = asyncio.get_running_loop().create_future()
+        try:
+            self._snapshot = await self._fetch(client)
+            self.refreshes += 1
+            self._refreshing.set_result(self._snapshot)
+            return self._snapshot
+
+        except Exception as err:
+            self._refreshing.set_exception(err)
+            self._refreshing.exception()
+            raise
+
+        finally:
+            self._refreshing = None
+
+    async def _fetch(self, client: Client) -> FeeSnapshot:
+        snapshot = FeeSnapshot(fetched_at=time.monotonic())
+
+        if self.network.tx_type != 2:
+            async with client.batch() as batch:
+                gas_price = batch.gas_price()
+            snapshot.gas_price = gas_price.result()
+            return snapshot
+
+        async with client.batch() as batch:
+            history = batch.add(RPC.eth_feeHistory, (self.history_blocks, "latest", self.percentiles))
+            block = batch.get_block("latest")
+            priority_fee = batch.max_priority_fee()
+
+        if priority_fee.exception() is None:
+            snapshot.node_priority_fee = priority_fee.result()
+
+        if history.exception() is None and history.result().get("reward"):
+            history = history.result()
+            snapshot.base_fee = history["baseFeePerGas"][-1]
+            snapshot.block_number = history["oldestBlock"] + len(history["baseFeePerGas"]) - 2
+            for i, percentile in enumerate(self.percentiles):
+                snapshot.rewards[percentile] = int(statistics.median(reward[i] for reward in history["reward"]))
+            return snapshot
+
+        block = block.result()
+        snapshot.base_fee = block.get("baseFeePerGas")
+        snapshot.block_number = block.get("number")
+        if snapshot.node_priority_fee is None:
+            priority_fee.result()
+        return snapshot
+
+    async def suggest(self, client: Client, strategy: FeeStrategy = FeeStrategies.Normal) -> FeeSuggestion:
+        """
+        Suggest transaction fees.
+
+        :param Client client: the client whose transport is used if the cached data is stale
+        :param FeeStrategy strategy: the EIP-1559 strategy (ignored on legacy networks)
+        :return FeeSuggestion: the fees
+        """
+        snapshot = await self.snapshot(client)
+        if snapshot.gas_price is not None:
+            return FeeSuggestion(gas_price=snapshot.gas_price)
+
+        priority_fee = snapshot.rewards.get(strategy.percentile)
+        if not priority_fee:
+            priority_fee = snapshot.node_priority_fee or 0
+
+        return FeeSuggestion(
+            max_fee_per_gas=int(snapshot.base_fee * strategy.base_fee_multiplier) + priority_fee,
+            max_priority_fee_per_gas=priority_fee,
+        )
+
+    async def gas_price(self, client: Client) -> int:
+        """
+        Get the legacy gas price, or the next block base fee plus the node's priority fee on EIP-1559 networks.
+        """
+        snapshot = await self.snapshot(client)
+        if snapshot.gas_price is not None:
+            return snapshot.gas_price
+        return snapshot.base_fee + (snapshot.node_priority_fee or 0)
+
+
+class FeeOracleRegistry:
+    """
+    Keeps one FeeOracle per network (chain id).
+    """
+
+    def __init__(self, ttl: float = 3.0) -> None:
+        self.ttl = ttl
+        self._oracles: dict[int, FeeOracle] = {}
+
+    def get(self, network: Network) -> FeeOracle:
+        oracle = self._oracles.get(network.chain_id)
+        if oracle is None:
+            oracle = FeeOracle(network=network, ttl=self.ttl)
+            self._oracles[network.chain_id] = oracle
+        return oracle
+
+    def summary(self) -> str:
+        hits = sum(oracle.hits for oracle in self._oracles.values())
+        refreshes = sum(oracle.refreshes for oracle in self._oracles.values())
+        return f"Fee oracles: {len(self._oracles)} networks | cache hits: {hits} | refreshes: {refreshes}"
+
+
+fee_oracles = FeeOracleRegistry()
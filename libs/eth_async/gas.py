@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+
+from hexbytes import HexBytes
+
+OUT_OF_GAS_ERRORS = ("out of gas", "intrinsic gas too low", "gas limit reached", "gas required exceeds")
+# calls whose gas depends on whether a storage slot goes from zero to non-zero (about 46k vs 29k for approve), which the
+# calldata shape does not show, so they are always estimated
+UNCACHED_SELECTORS = ("0x095ea7b3", "0x39509351")  # approve(address,uint256), increaseAllowance(address,uint256)
+
+
+def is_out_of_gas(err: BaseException) -> bool:
+    message = str(err).lower()
+    return any(text in message for text in OUT_OF_GAS_ERRORS)
+
+
+def calldata_shape(data: str | bytes | None, value: int | None = None) -> tuple:
+    """
+    Get a normalised signature of a call: the 4-byte selector, the calldata length and which 32-byte argument words are
+    zero, plus whether value is sent.
+
+    Calls with the same shape run the same code path with arguments of the same size, e.g. approve() of any non-zero
+    amount, so their gas usage differs only by a small margin.
+    """
+    data = HexBytes(data or b"")
+    words = data[4:]
+    mask = "".join("0" if not any(words[i : i + 32]) else "1" for i in range(0, len(words), 32))
+    return data[:4].hex(), len(data), mask, bool(value)
+
+
+class GasEstimateCache:
+    """
+    A bounded LRU cache of eth_estimateGas results keyed by (chain id, sender, target, calldata shape).
+
+    Most transactions of the software repeat the same calls (IRYS deposits, fixed-calldata mints), so after the first
+    estimate of a shape the gas limit is taken from the cache, saving an RPC round trip per send. Fresh and cached
+    estimates get the same 'margin' on top (see limit()). The largest estimate seen for a shape is kept. An entry is
+    dropped when a transaction sent with it runs out of gas, so the next send estimates again. Calls whose gas depends
+    on storage state (UNCACHED_SELECTORS) are never cached.
+    """
+
+    def __init__(self, margin: float = 1.2, max_size: int = 4096) -> None:
+        self.margin = margin
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._estimates: OrderedDict[tuple, int] = OrderedDict()
+
+    def configure(self, margin: float | None = None) -> None:
+        if margin is not None:
+            self.margin = max(margin, 1.0)
+
+    @staticmethod
+    def key(chain_id: int, tx_params: dict) -> tuple | None:
+        """
+        Get the cache key of a transaction, or None if it is not cached (contract deployments, UNCACHED_SELECTORS).
+        """
+        to = tx_params.get("to")
+        if not to:
+            return None
+
+        shape = calldata_shape(tx_params.get("data"), tx_params.get("value"))
+        if shape[0] in UNCACHED_SELECTORS:
+            return None
+        return (chain_id, str(tx_params.get("from") or "").lower(), str(to).lower()) + shape
+
+    def limit(self, estimate: int) -> int:
+        """
+        Get the gas limit of a transaction from its estimate.
+        """
+        return math.ceil(estimate * self.margin)
+
+    def get(self, chain_id: int, tx_params: dict) -> int | None:
+        """
+        Get a cached gas limit (the estimate multiplied by the margin).
+
+        :param int chain_id: the chain id
+        :param dict tx_params: parameters of the transaction
+        :return int | None: the gas limit or None if the shape was not estimated yet
+        """
+        key = self.key(chain_id, tx_params)
+        estimate = self._estimates.get(key) if key else None
+        if estimate is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._estimates.move_to_end(key)
+        return self.limit(estimate)
+
+    def set(self, chain_id: int, tx_params: dict, estimate: int) -> None:
+        key = self.key(chain_id, tx_params)
+        if not key:
+            return
+
+        self._estimates[key] = max(estimate, self._estimates.get(key, 0))
+        self._estimates.move_to_end(key)
+        if len(self._estimates) > self.max_size:
+            self._estimates.popitem(last=False)
+
+    def invalidate(self, chain_id: int, tx_params: dict) -> None:
+        key = self.key(chain_id, tx_params)
+        if key and self._estimates.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def observe(self, chain_id: int, tx_params: dict | None, receipt: dict) -> None:
+        """
+        Drop the estimate of a transaction that failed with (nearly) all of its gas used, i.e. ran out of gas.
+        """
+        if not tx_params or not tx_params.get("gas") or receipt.get("status", 1) != 0:
+            return
+
+        # a sub-call running out of gas leaves up to 1/64 of the gas to the caller (EIP-150)
+        if receipt.get("gasUsed", 0) * 64 >= int(tx_params["gas"]) * 63:
+            self.invalidate(chain_id, tx_params)
+
+    def summary(self) -> str:
+        return (
+            f"Gas estimates: {len(self._estimates)} shapes | margin: {self.margin} | hits: {self.hits} | misses: {self.misses} | "
+            f"invalidated: {self.invalidations}"
+        )
+
+
+gas_estimates = GasEstimateCache()
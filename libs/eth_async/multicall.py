@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+from eth_abi import decode, encode
+from eth_abi.exceptions import DecodingError
+from eth_typing import ChecksumAddress
+from hexbytes import HexBytes
+from web3 import Web3
+from web3._utils.abi import get_abi_output_types
+from web3.contract.async_contract import AsyncContractFunction
+from web3.exceptions import ContractLogicError
+
+from . import exceptions
+from .batch import BatchRequest
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+MULTICALL3_ADDRESS = Web3.to_checksum_address("0xcA11bde05977b3631167028862bE2a173976CA11")
+AGGREGATE3_SELECTOR = HexBytes("0x82ad56cb")
+
+
+class MulticallUnavailable(Exception):
+    pass
+
+
+class _PendingCall:
+    def __init__(self, client: Client, target: ChecksumAddress, data: bytes, allow_failure: bool) -> None:
+        self.client = client
+        self.target = target
+        self.data = data
+        self.allow_failure = allow_failure
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class Multicall:
+    """
+    Collects eth_call view calls from many coroutines and sends them as Multicall3 'aggregate3' calls.
+
+    Calls that arrive within 'window' seconds are packed into aggregate3 calls of at most 'batch_size' sub-calls, and all
+    aggregate3 calls of one flush are sent in a single JSON-RPC batch. If the network has no Multicall3 deployment, the
+    aggregator switches to plain eth_call requests (still sent as one JSON-RPC batch).
+    """
+
+    def __init__(self, batch_size: int = 500, window: float = 0.02, address: ChecksumAddress = MULTICALL3_ADDRESS) -> None:
+        self.batch_size = batch_size
+        self.window = window
+        self.address = address
+        self.supported: bool | None = None
+        self.calls = 0
+        self.requests = 0
+        self._pending: list[_PendingCall] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def call(self, client: Client, target: str, data: bytes | str, allow_failure: bool = False) -> HexBytes:
+        """
+        Queue a view call and wait for its raw return data.
+
+        :param Client client: the client whose transport is used if the calls have to be sent without Multicall3
+        :param str target: the contract address
+        :param bytes | str data: the call data
+        :param bool allow_failure: return empty bytes instead of raising ContractLogicError if the sub-call reverts
+        :return HexBytes: the raw return data
+        """
+        call = _PendingCall(client=client, target=Web3.to_checksum_address(target), data=HexBytes(data), allow_failure=allow_failure)
+        self._pending.append(call)
+        self.calls += 1
+
+        if len(self._pending) >= self.batch_size:
+            self._schedule_flush(now=True)
+        elif self._flush_handle is None:
+            self._schedule_flush()
+
+        return await call.future
+
+    async def call_function(self, client: Client, function: AsyncContractFunction) -> Any:
+        """
+        Queue a prepared contract function call, e.g. contract.functions.balanceOf(address), and decode its output.
+
+        :return Any: the decoded value (a tuple if the function has several outputs)
+        """
+        output_types = get_abi_output_types(function.abi)
+        data = await self.call(client=client, target=function.address, data=function._encode_transaction_data())
+        result = decode(output_types, data)
+        return result[0] if len(result) == 1 else result
+
+    def _schedule_flush(self, now: bool = False) -> None:
+        loop = asyncio.get_running_loop()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if now:
+            self._start_flush()
+        else:
+            self._flush_handle = loop.call_later(self.window, self._start_flush)
+
+    def _start_flush(self) -> None:
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self) -> None:
+        """
+        Send every queued call now.
+        """
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        try:
+            if self.supported is not False:
+                try:
+                    await self._send_aggregated(pending)
+                    self.supported = True
+                    return
+
+                except (MulticallUnavailable, ContractLogicError, exceptions.RPCError):
+                    if self.supported:
+                        raise
+                    self.supported = False
+
+            await self._send_direct(pending)
+
+        except Exception as err:
+            for call in pending:
+                if not call.future.done():
+                    call.future.set_exception(err)
+
+    async def _send_aggregated(self, pending: list[_PendingCall]) -> None:
+        chunks = [pending[i : i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        batch = BatchRequest(client=pending[0].client)
+        futures = []
+        for chunk in chunks:
+            # every sub-call may fail, so one revert does not revert the whole chunk; failures are raised per caller below
+            data = AGGREGATE3_SELECTOR + encode(["(address,bool,bytes)[]"], [[(call.target, True, call.data) for call in chunk]])
+            futures.append(batch.call({"to": self.address, "data": Web3.to_hex(data)}))
+
+        self.requests += len(chunks)
+        await batch.execute()
+
+        for chunk, future in zip(chunks, futures):
+            if not future.result():
+                raise MulticallUnavailable(f"Multicall3 is not deployed at {self.address}")
+
+            try:
+                (results,) = decode(["(bool,bytes)[]"], future.result())
+            except DecodingError as err:
+                raise MulticallUnavailable(f"Can not decode Multicall3 response: {err}")
+
+            if len(results) != len(chunk):
+                raise MulticallUnavailable("Multicall3 returned an unexpected number of results")
+
+            for call, (success, return_data) in zip(chunk, results):
+                if success:
+                    call.future.set_result(HexBytes(return_data))
+                elif call.allow_failure:
+                    call.future.set_result(HexBytes(b""))
+                else:
+                    call.future.set_exception(ContractLogicError(f"execution reverted: call to {call.target} failed", data=return_data))
+
+    async def _send_direct(self, pending: list[_PendingCall]) -> None:
+        batch = BatchRequest(client=pending[0].client)
+        pending = [call for call in pending if not call.future.done()]
+        futures = [batch.call({"to": call.target, "data": Web3.to_hex(call.data)}) for call in pending]
+        self.requests += 1
+        await batch.execute()
+
+        for call, future in zip(pending, futures):
+            if future.exception() is None:
+                call.future.set_result(future.result())
+            elif call.allow_failure:
+                call.future.set_result(HexBytes(b""))
+            else:
+                call.future.set_exception(future.exception())
+
+
+class MulticallRegistry:
+    """
+    Keeps one Multicall aggregator per RPC transport.
+
+    By default calls are aggregated only between clients that share a transport, i.e. the same RPC and the same proxy, so a
+    wallet's reads never leave through another wallet's proxy. With isolate_proxies=False calls are aggregated per RPC URL.
+    """
+
+    def __init__(self, batch_size: int = 500, window: float = 0.02, isolate_proxies: bool = True) -> None:
+        self.batch_size = batch_size
+        self.window = window
+        self.isolate_proxies = isolate_proxies
+        self._multicalls: dict[tuple, Multicall] = {}
+
+    def configure(self, isolate_proxies: bool | None = None) -> None:
+        """
+        Change the scope of the aggregators; clients pick up theirs on the next call.
+
+        :param bool | None isolate_proxies: aggregate calls only between clients with the same proxy
+        """
+        if isolate_proxies is not None:
+            self.isolate_proxies = isolate_proxies
+
+    def get(self, client: Client) -> Multicall:
+        transport = client.transport
+        key = (transport.endpoint_uri, transport.proxy) if self.isolate_proxies else (transport.endpoint_uri,)
+        multicall = self._multicalls.get(key)
+        if multicall is None:
+            multicall = Multicall(batch_size=self.batch_size, window=self.window)
+            self._multicalls[key] = multicall
+        return multicall
+
+    def summary(self) -> str:
+        calls = sum(m.calls for m in self._multicalls.values())
+        requests = sum(m.requests for m in self._multicalls.values())
+        return f"Multicall: {calls} view calls in {requests} RPC requests"
+
+
+multicalls = MulticallRegistry()
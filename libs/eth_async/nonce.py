@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+from typing import TYPE_CHECKING
+
+from eth_typing import ChecksumAddress
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+NONCE_TOO_LOW_ERRORS = ("nonce too low", "nonce is too low", "oldnonce")
+ALREADY_KNOWN_ERRORS = ("already known", "known transaction", "already imported", "already in mempool")
+TRANSIENT_RPC_ERRORS = ("rate limit", "too many requests", "timeout", "timed out", "try again", "temporarily", "busy")
+
+
+def is_nonce_too_low(err: BaseException) -> bool:
+    message = str(err).lower()
+    return any(text in message for text in NONCE_TOO_LOW_ERRORS)
+
+
+def is_already_known(err: BaseException) -> bool:
+    message = str(err).lower()
+    return any(text in message for text in ALREADY_KNOWN_ERRORS)
+
+
+def is_rejected(err: BaseException) -> bool:
+    """
+    Whether a node refused a broadcast transaction (funds, fees, nonce), so sending the same raw transaction again will
+    be refused too. Transport failures and rate limits are not rejections: the transaction may have reached the node.
+    """
+    if not isinstance(err, ValueError) or is_already_known(err):
+        return False
+
+    message = str(err).lower()
+    return not any(text in message for text in TRANSIENT_RPC_ERRORS)
+
+
+class NonceManager:
+    """
+    Hands out nonces for one (chain, address) pair locally.
+
+    The manager is seeded once from the 'pending' transaction count. After that nonces are allocated without RPC calls.
+    Nonces of transactions that were never broadcast are released and handed out again before new ones. A resync
+    re-reads the 'pending' count, e.g. after a "nonce too low" error.
+    """
+
+    def __init__(self, chain_id: int, address: ChecksumAddress) -> None:
+        self.chain_id = chain_id
+        self.address = address
+        self.next_nonce: int | None = None
+        self.resyncs = 0
+        self._released: list[int] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def seeded(self) -> bool:
+        return self.next_nonce is not None
+
+    async def _fetch(self, client: Client) -> int:
+        return await client.w3.eth.get_transaction_count(self.address, "pending")
+
+    def seed(self, nonce: int) -> None:
+        """
+        Seed the manager with a 'pending' transaction count fetched elsewhere, e.g. in a JSON-RPC batch.
+        """
+        if self.next_nonce is None:
+            self.next_nonce = nonce
+
+    async def peek(self, client: Client) -> int:
+        """
+        Get the nonce the next allocate() call would return, without reserving it.
+        """
+        async with self._lock:
+            if self.next_nonce is None:
+                self.next_nonce = await self._fetch(client)
+            return self._released[0] if self._released else self.next_nonce
+
+    async def allocate(self, client: Client) -> int:
+        """
+        Reserve a nonce for a transaction that is about to be signed.
+        """
+        async with self._lock:
+            if self.next_nonce is None:
+                self.next_nonce = await self._fetch(client)
+
+            if self._released:
+                return heapq.heappop(self._released)
+
+            nonce = self.next_nonce
+            self.next_nonce += 1
+            return nonce
+
+    def release(self, nonce: int) -> None:
+        """
+        Return a nonce whose transaction was never broadcast.
+        """
+        if self.next_nonce is None or nonce >= self.next_nonce or nonce in self._released:
+            return
+
+        if nonce == self.next_nonce - 1:
+            self.next_nonce = nonce
+            while self._released and max(self._released) == self.next_nonce - 1:
+                self._released.remove(self.next_nonce - 1)
+                self.next_nonce -= 1
+            heapq.heapify(self._released)
+        else:
+            heapq.heappush(self._released, nonce)
+
+    async def resync(self, client: Client) -> int:
+        """
+        Re-read the 'pending' transaction count and continue from it.
+        """
+        async with self._lock:
+            self.next_nonce = await self._fetch(client)
+            self._released = []
+            self.resyncs += 1
+            return self.next_nonce
+
+    def reset(self) -> None:
+        """
+        Forget the local state, the next allocation re-seeds from the node.
+        """
+        self.next_nonce = None
+        self._released = []
+
+    def __repr__(self) -> str:
+        return f"<NonceManager chain_id={self.chain_id} address={self.address} next_nonce={self.next_nonce}>"
+
+
+class NonceRegistry:
+    """
+    Keeps one NonceManager per (chain id, address).
+    """
+
+    def __init__(self) -> None:
+        self._managers: dict[tuple[int, str], NonceManager] = {}
+
+    def get(self, chain_id: int, address: ChecksumAddress) -> NonceManager:
+        key = (chain_id, address)
+        manager = self._managers.get(key)
+        if manager is None:
+            manager = NonceManager(chain_id=chain_id, address=address)
+            self._managers[key] = manager
+        return manager
+
+
+nonces = NonceRegistry()
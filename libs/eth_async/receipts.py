@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+from hexbytes import HexBytes
+from loguru import logger
+from web3.exceptions import TimeExhausted
+from web3.types import _Hash32
+
+from .chain_data import chain_data, load_receipt, receipt_key
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+class ReceiptTracker:
+    """
+    Waits for transaction receipts of many pending transactions with one polling loop.
+
+    The loop polls eth_blockNumber every 'poll_interval' seconds while there are waiters. When a new block appears, the
+    receipts of all outstanding hashes are requested in a single JSON-RPC batch and every waiter whose receipt arrived
+    is resolved. RPC load therefore grows with the number of blocks, not with the number of pending transactions.
+    """
+
+    def __init__(self, poll_interval: float = 1.0) -> None:
+        self.poll_interval = poll_interval
+        self.last_block: int | None = None
+        self.blocks_seen = 0
+        self.receipt_requests = 0
+        self._waiters: dict[HexBytes, tuple[asyncio.Future, Client]] = {}
+        self._refs: dict[asyncio.Future, int] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._waiters)
+
+    async def wait(self, client: Client, tx_hash: str | _Hash32, timeout: int | float = 120) -> dict[str, Any]:
+        """
+        Wait for a transaction receipt.
+
+        :param Client client: the client whose transport is used for polling
+        :param str | _Hash32 tx_hash: the transaction hash
+        :param int | float timeout: the receipt waiting timeout
+        :return dict[str, Any]: the transaction receipt
+        """
+        cached = chain_data.get("receipt", receipt_key(client.network.chain_id, tx_hash))
+        if cached is not None:
+            return load_receipt(cached)
+
+        tx_hash = HexBytes(tx_hash)
+        waiter = self._waiters.get(tx_hash)
+        if waiter is None:
+            waiter = (asyncio.get_running_loop().create_future(), client)
+            self._waiters[tx_hash] = waiter
+        future = waiter[0]
+        self._refs[future] = self._refs.get(future, 0) + 1
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+
+        except asyncio.TimeoutError:
+            raise TimeExhausted(f"Transaction {tx_hash.hex()} is not in the chain after {timeout} seconds")
+
+        finally:
+            # stop polling the hash once nobody waits for it (timeout or cancellation, e.g. a replaced transaction)
+            self._refs[future] -= 1
+            if not self._refs[future]:
+                del self._refs[future]
+                if self._waiters.get(tx_hash) is waiter:
+                    del self._waiters[tx_hash]
+
+    async def _run(self) -> None:
+        while self._waiters:
+            client = next(iter(self._waiters.values()))[1]
+            try:
+                block_number = await client.w3.eth.block_number
+                if self.last_block is None or block_number != self.last_block:
+                    self.last_block = block_number
+                    self.blocks_seen += 1
+                    await self._fetch_receipts(client)
+
+            except Exception as err:
+                logger.debug(f"Receipt tracker poll failed: {err}")
+
+            await asyncio.sleep(self.poll_interval)
+
+    async def _fetch_receipts(self, client: Client) -> None:
+        hashes = list(self._waiters)
+        async with client.batch() as batch:
+            receipts = [batch.get_transaction_receipt(tx_hash) for tx_hash in hashes]
+        self.receipt_requests += 1
+
+        for tx_hash, receipt in zip(hashes, receipts):
+            if receipt.exception() is not None or not receipt.result():
+                continue
+
+            future, _ = self._waiters.pop(tx_hash, (None, None))
+            if future is not None and not future.done():
+                future.set_result(dict(receipt.result()))
+
+
+class ReceiptTrackerRegistry:
+    """
+    Keeps one ReceiptTracker per RPC transport.
+
+    Like MulticallRegistry, trackers are scoped to the same RPC and proxy by default, so a wallet's receipts are never
+    polled through another wallet's proxy. With isolate_proxies=False (the setting of the same name) there is one tracker
+    per RPC URL, so one block poller serves all wallets of a network.
+    """
+
+    def __init__(self, poll_interval: float = 1.0, isolate_proxies: bool = True) -> None:
+        self.poll_interval = poll_interval
+        self.isolate_proxies = isolate_proxies
+        self._trackers: dict[tuple, ReceiptTracker] = {}
+
+    def configure(self, isolate_proxies: bool | None = None) -> None:
+        """
+        Change the scope of the trackers; clients pick up theirs on the next wait.
+
+        :param bool | None isolate_proxies: poll receipts only for clients with the same proxy
+        """
+        if isolate_proxies is not None:
+            self.isolate_proxies = isolate_proxies
+
+    def get(self, client: Client) -> ReceiptTracker:
+        transport = client.transport
+        key = (transport.endpoint_uri, transport.proxy) if self.isolate_proxies else (transport.endpoint_uri,)
+        tracker = self._trackers.get(key)
+        if tracker is None:
+            tracker = ReceiptTracker(poll_interval=self.poll_interval)
+            self._trackers[key] = tracker
+        return tracker
+
+    def summary(self) -> str:
+        pending = sum(tracker.pending for tracker in self._trackers.values())
+        blocks = sum(tracker.blocks_seen for tracker in self._trackers.values())
+        requests = sum(tracker.receipt_requests for tracker in self._trackers.values())
+        return f"Receipt trackers: {len(self._trackers)} | pending: {pending} | blocks seen: {blocks} | receipt batches: {requests}"
+
+
+receipt_trackers = ReceiptTrackerRegistry()
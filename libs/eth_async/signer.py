@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from eth_account import Account
+from eth_account.datastructures import SignedTransaction
+from eth_account.signers.local import LocalAccount
+from web3.types import TxParams
+
+SIGNER_BACKENDS = ("inline", "thread", "process")
+
+
+def _sign_transaction(tx_params: dict, private_key: bytes) -> SignedTransaction:
+    return Account.sign_transaction(transaction_dict=tx_params, private_key=private_key)
+
+
+class Signer:
+    """
+    Signs transactions either on the event loop ('inline', the default) or in a pool of worker threads or processes.
+
+    Signing and key derivation are pure-Python secp256k1 and keccak work. With many concurrent wallets this CPU time
+    delays every other coroutine, so the 'thread' and 'process' backends move it off the loop. At most 'max_pending'
+    signatures wait for the pool at once, further callers wait for a free slot. Derived accounts are memoized, so a
+    private key is turned into an account once per process.
+    """
+
+    def __init__(self, backend: str = "inline", workers: int | None = None, max_pending: int = 64, max_accounts: int = 4096) -> None:
+        self.backend = "inline"
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_accounts = max_accounts
+        self.signed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._accounts: OrderedDict[bytes | str, LocalAccount] = OrderedDict()
+        self.configure(backend=backend, workers=workers, max_pending=max_pending)
+
+    def configure(self, backend: str = "inline", workers: int | None = None, max_pending: int | None = None) -> None:
+        """
+        Switch the signing backend.
+
+        :param str backend: 'inline', 'thread' or 'process'
+        :param int | None workers: the pool size (the executor default if None)
+        :param int | None max_pending: the maximum number of signatures queued for the pool
+        """
+        if backend not in SIGNER_BACKENDS:
+            raise ValueError(f"Unknown signer backend: {backend}. Available: {', '.join(SIGNER_BACKENDS)}")
+
+        if backend == self.backend and workers == self.workers and (max_pending is None or max_pending == self.max_pending):
+            return
+
+        self.shutdown()
+        self.backend = backend
+        self.workers = workers
+        if max_pending is not None:
+            self.max_pending = max_pending
+
+        if backend == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="signer")
+        elif backend == "process":
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+
+    def derive_account(self, private_key: bytes | str) -> LocalAccount:
+        """
+        Get the account of a private key, deriving it only the first time.
+        """
+        account = self._accounts.get(private_key)
+        if account is None:
+            account = Account.from_key(private_key)
+            self._accounts[private_key] = account
+            if len(self._accounts) > self.max_accounts:
+                self._accounts.popitem(last=False)
+        else:
+            self._accounts.move_to_end(private_key)
+        return account
+
+    async def sign_transaction(self, tx_params: TxParams, private_key: bytes) -> SignedTransaction:
+        """
+        Sign a transaction with the configured backend.
+
+        :param TxParams tx_params: parameters of the transaction
+        :param bytes private_key: the private key
+        :return SignedTransaction: the signed transaction
+        """
+        started = time.perf_counter()
+        if self._executor is None:
+            signed_tx = _sign_transaction(dict(tx_params), bytes(private_key))
+        else:
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.max_pending)
+
+            async with self._semaphore:
+                loop = asyncio.get_running_loop()
+                signed_tx = await loop.run_in_executor(self._executor, _sign_transaction, dict(tx_params), bytes(private_key))
+
+        latency = time.perf_counter() - started
+        self.signed += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        return signed_tx
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._semaphore = None
+
+    def summary(self) -> str:
+        avg = self.total_latency / self.signed if self.signed else 0.0
+        return f"Signer ({self.backend}): signed: {self.signed} | avg latency: {avg * 1000:.1f}ms | max: {self.max_latency * 1000:.1f}ms"
+
+
+signer = Signer()
@@ -1,20 +1,26 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+import asyncio
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
 
 from eth_account.datastructures import SignedTransaction
 from hexbytes import HexBytes
-from web3 import AsyncWeb3, Web3
+from loguru import logger
+from web3 import AsyncWeb3
+from web3.exceptions import TimeExhausted
 
 # from web3.middleware import ExtraDataToPOAMiddleware
 from web3.types import TxParams, TxReceipt, _Hash32
 
-from libs.eth_async.utils.web_requests import async_post
-
 from . import exceptions
+from .chain_data import chain_data, dump_receipt, load_receipt, receipt_key
 from .classes import AutoRepr
 from .data import types
 from .data.models import CommonValues, TokenAmount, TxArgs
+from .fees import FeeStrategies, FeeStrategy, FeeSuggestion, ReplacementPolicy
+from .gas import gas_estimates, is_out_of_gas
+from .nonce import is_already_known, is_nonce_too_low
+from .signer import signer
 from .utils.utils import api_key_required
 
 if TYPE_CHECKING:
@@ -29,6 +35,7 @@ class Tx(AutoRepr):
         hash (Optional[_Hash32]): a transaction hash.
         params (Optional[dict]): the transaction parameters.
         receipt (Optional[TxReceipt]): a transaction receipt.
+        raw_transaction (Optional[HexBytes]): the signed transaction bytes, if it was signed by this client.
         function_identifier (Optional[str]): a function identifier.
         input_data (Optional[Dict[str, Any]]): an input data.
 
@@ -37,16 +44,18 @@ class Tx(AutoRepr):
     hash: _Hash32 | None
     params: dict | None
     receipt: TxReceipt | None
+    raw_transaction: HexBytes | None
     function_identifier: str | None
     input_data: dict[str, Any] | None
 
-    def __init__(self, tx_hash: str | _Hash32 | None = None, params: dict | None = None) -> None:
+    def __init__(self, tx_hash: str | _Hash32 | None = None, params: dict | None = None, raw_transaction: bytes | None = None) -> None:
         """
         Initialize the class.
 
         Args:
             tx_hash (Optional[Union[str, _Hash32]]): the transaction hash. (None)
             params (Optional[dict]): a dictionary with transaction parameters. (None)
+            raw_transaction (Optional[bytes]): the signed transaction bytes. (None)
 
         """
         if not tx_hash and not params:
@@ -58,6 +67,7 @@ class Tx(AutoRepr):
         self.hash = tx_hash
         self.params = params
         self.receipt = None
+        self.raw_transaction = HexBytes(raw_transaction) if raw_transaction else None
         self.function_identifier = None
         self.input_data = None
 
@@ -76,53 +86,121 @@ class Tx(AutoRepr):
         self.params = {
             "chainId": client.network.chain_id,
             "nonce": int(tx_data.get("nonce")),
-            "gasPrice": int(tx_data.get("gasPrice")),
             "gas": int(tx_data.get("gas")),
             "from": tx_data.get("from"),
             "to": tx_data.get("to"),
             "data": tx_data.get("input"),
             "value": int(tx_data.get("value")),
         }
+        if tx_data.get("maxFeePerGas") is not None:
+            self.params["maxFeePerGas"] = int(tx_data.get("maxFeePerGas"))
+            self.params["maxPriorityFeePerGas"] = int(tx_data.get("maxPriorityFeePerGas"))
+        else:
+            self.params["gasPrice"] = int(tx_data.get("gasPrice"))
         return self.params
 
     async def wait_for_receipt(self, client, timeout: int | float = 120, poll_latency: float = 0.1) -> dict[str, Any]:
         """
-        Wait for the transaction receipt.
+        Wait for the transaction receipt. The receipt is fetched by the client's shared ReceiptTracker once per new block.
 
         Args:
             client (Client): the Client instance.
             timeout (Union[int, float]): the receipt waiting timeout. (120 sec)
-            poll_latency (float): the poll latency. (0.1 sec)
+            poll_latency (float): kept for compatibility, the tracker's poll interval is used instead.
 
         Returns:
             Dict[str, Any]: the transaction receipt.
 
         """
-        self.receipt = await client.transactions.wait_for_receipt(
-            w3=client.w3, tx_hash=self.hash, timeout=timeout, poll_latency=poll_latency
-        )
+        try:
+            self.receipt = await client.receipts.wait(client=client, tx_hash=self.hash, timeout=timeout)
+        except TimeExhausted:
+            # the transaction may have been dropped from the mempool, its nonce must be handed out again
+            await client.nonce_manager.resync(client)
+            raise
+
+        gas_estimates.observe(client.network.chain_id, self.params, self.receipt)
         return self.receipt
 
     async def decode_input_data(self):
         pass
 
-    async def cancel(self):
-        pass
+    async def _replace(
+        self, client, params: dict, policy: ReplacementPolicy, on_signed: Callable[[Tx], Awaitable[None]] | None = None
+    ) -> Tx:
+        market = await client.fee_oracle.suggest(client, strategy=client.transactions.fee_strategy)
+        params.update(policy.bump(params, market))
+        signed_tx = await client.transactions.sign_transaction(params)
+        if on_signed is not None:
+            await on_signed(Tx(tx_hash=signed_tx.hash, params=params, raw_transaction=signed_tx.rawTransaction))
 
-    async def speed_up(self):
-        pass
+        try:
+            await client.w3.eth.send_raw_transaction(transaction=signed_tx.rawTransaction)
+
+        except Exception as err:
+            if not is_already_known(err):
+                raise
+
+        return Tx(tx_hash=signed_tx.hash, params=params, raw_transaction=signed_tx.rawTransaction)
+
+    async def speed_up(
+        self, client, policy: ReplacementPolicy = ReplacementPolicy(), on_signed: Callable[[Tx], Awaitable[None]] | None = None
+    ) -> Tx:
+        """
+        Rebroadcast the transaction with the same nonce and bumped fees.
+
+        Args:
+            client (Client): the Client instance.
+            policy (ReplacementPolicy): the fee bump policy.
+            on_signed (Optional[Callable[[Tx], Awaitable[None]]]): awaited with the replacement before it is broadcast. (None)
+
+        Returns:
+            Tx: the replacement transaction.
+
+        """
+        params = dict(self.params or await self.parse_params(client))
+        return await self._replace(client, params=params, policy=policy, on_signed=on_signed)
+
+    async def cancel(self, client, policy: ReplacementPolicy = ReplacementPolicy()) -> Tx:
+        """
+        Replace the transaction with a 0-value transfer to the sender with the same nonce and bumped fees.
+
+        Args:
+            client (Client): the Client instance.
+            policy (ReplacementPolicy): the fee bump policy.
+
+        Returns:
+            Tx: the cancelling transaction.
+
+        """
+        params = self.params or await self.parse_params(client)
+        cancel_params = {
+            "chainId": params.get("chainId", client.network.chain_id),
+            "nonce": params["nonce"],
+            "from": client.account.address,
+            "to": client.account.address,
+            "value": 0,
+            "data": "0x",
+            "gas": 21000,
+        }
+        for key in ("gasPrice", "maxFeePerGas", "maxPriorityFeePerGas"):
+            if params.get(key) is not None:
+                cancel_params[key] = params[key]
+
+        return await self._replace(client, params=cancel_params, policy=policy)
 
 
 class Transactions:
-    def __init__(self, client: Client) -> None:
+    def __init__(self, client: Client, fee_strategy: FeeStrategy = FeeStrategies.Normal) -> None:
         self.client = client
+        self.fee_strategy = fee_strategy
 
     async def gas_price(self) -> TokenAmount:
         """
         Get the current gas price
         :return: gas price
         """
-        return TokenAmount(amount=await self.client.w3.eth.gas_price, wei=True)
+        return TokenAmount(amount=await self.client.fee_oracle.gas_price(self.client), wei=True)
 
     async def max_priority_fee(self) -> TokenAmount:
         """
@@ -132,11 +210,8 @@ class Transactions:
             Wei: the current max priority fee.
 
         """
-        query = [{"id": 26, "jsonrpc": "2.0", "method": "eth_maxPriorityFeePerGas"}]
-
-        response = await async_post(url=self.client.network.rpc, json=query)
-        max_priority_fee_per_gas = int(response[0]["result"], 16)
-        return TokenAmount(amount=max_priority_fee_per_gas, wei=True)
+        fees = await self.client.fee_oracle.suggest(self.client, strategy=self.fee_strategy)
+        return TokenAmount(amount=fees.max_priority_fee_per_gas or 0, wei=True)
 
     async def estimate_gas(self, tx_params: TxParams) -> TokenAmount:
         """
@@ -154,57 +229,78 @@ class Transactions:
             wei=True,
         )
 
-    async def auto_add_params(self, tx_params: TxParams) -> TxParams:
+    async def auto_add_params(self, tx_params: TxParams, use_cache: bool = True) -> TxParams:
         """
         Add 'chainId', 'nonce', 'from', 'gasPrice' or 'maxFeePerGas' + 'maxPriorityFeePerGas' and 'gas' parameters to
-            transaction parameters if they are missing.
+            transaction parameters if they are missing. The nonce and gas estimate are fetched in a single JSON-RPC batch,
+            fees come from the network's shared FeeOracle.
 
         Args:
             tx_params (TxParams): parameters of the transaction.
+            use_cache (bool): take the gas limit from the gas estimate cache if the call shape is known. Pass False when
+                the estimate itself is the check, i.e. a revert of eth_estimateGas means the call must not be sent. (True)
 
         Returns:
             TxParams: parameters of the transaction with added values.
 
         """
-
         if "chainId" not in tx_params:
             tx_params["chainId"] = self.client.network.chain_id
 
-        if not tx_params.get("nonce"):
-            tx_params["nonce"] = await self.client.wallet.nonce()
-
         if "from" not in tx_params:
             tx_params["from"] = self.client.account.address
 
-        if "gasPrice" not in tx_params and "maxFeePerGas" not in tx_params:
-            gas_price = (await self.gas_price()).Wei
-            if self.client.network.tx_type == 2:
-                tx_params["maxFeePerGas"] = gas_price
+        use_eip1559 = "maxFeePerGas" in tx_params or ("gasPrice" not in tx_params and self.client.network.tx_type == 2)
+        need_gas_price = not use_eip1559 and not int(tx_params.get("gasPrice") or 0)
 
-            else:
-                tx_params["gasPrice"] = gas_price
+        nonce_manager = self.client.nonce_manager
+        if tx_params.get("nonce") is None and nonce_manager.seeded:
+            tx_params["nonce"] = await nonce_manager.peek(self.client)
+
+        nonce = gas = fees = None
+        async with self.client.batch() as batch:
+            if tx_params.get("nonce") is None:
+                nonce = batch.get_transaction_count(block="pending")
+
+            if "gas" not in tx_params or not int(tx_params["gas"]):
+                cached_gas = gas_estimates.get(self.client.network.chain_id, tx_params) if use_cache else None
+                if cached_gas is not None:
+                    tx_params["gas"] = cached_gas
+                else:
+                    gas = batch.estimate_gas(
+                        tx_params={
+                            key: value for key, value in tx_params.items() if key in ("from", "to", "data", "value") and value is not None
+                        }
+                    )
+
+            if use_eip1559 or need_gas_price:
+                fees = asyncio.ensure_future(self.client.fee_oracle.suggest(self.client, strategy=self.fee_strategy))
 
-        elif "gasPrice" in tx_params and not int(tx_params["gasPrice"]):
-            tx_params["gasPrice"] = (await self.gas_price()).Wei
+        if fees is not None:
+            fees = await fees
 
-        if "maxFeePerGas" in tx_params:
-            block = await self.client.w3.eth.get_block("latest")
-            base_fee = block.get("baseFeePerGas")
-            recommended_priority_fee = await self.client.w3.eth.max_priority_fee
+        if nonce is not None:
+            nonce_manager.seed(nonce.result())
+            tx_params["nonce"] = nonce.result()
 
-            max_fee_per_gas = base_fee + recommended_priority_fee
+        if need_gas_price:
+            tx_params["gasPrice"] = fees.gas_price or await self.client.fee_oracle.gas_price(self.client)
 
-            tx_params["maxPriorityFeePerGas"] = recommended_priority_fee
-            tx_params["maxFeePerGas"] = int(max_fee_per_gas)
+        if use_eip1559:
+            if fees.gas_price is not None:
+                fees = FeeSuggestion(max_fee_per_gas=fees.gas_price, max_priority_fee_per_gas=fees.gas_price)
+            tx_params["maxPriorityFeePerGas"] = fees.max_priority_fee_per_gas
+            tx_params["maxFeePerGas"] = fees.max_fee_per_gas
 
-        if "gas" not in tx_params or not int(tx_params["gas"]):
-            tx_params["gas"] = (await self.estimate_gas(tx_params=tx_params)).Wei
+        if gas is not None:
+            gas_estimates.set(self.client.network.chain_id, tx_params, gas.result())
+            tx_params["gas"] = gas_estimates.limit(gas.result())
 
         return tx_params
 
     async def sign_transaction(self, tx_params: TxParams) -> SignedTransaction:
         """
-        Sign a transaction.
+        Sign a transaction with the process-wide signer (on the event loop or in a worker pool, see Signer).
 
         Args:
             tx_params (TxParams): parameters of the transaction.
@@ -213,27 +309,203 @@ class Transactions:
             SignedTransaction: the signed transaction.
 
         """
-        return self.client.w3.eth.account.sign_transaction(transaction_dict=tx_params, private_key=self.client.account.key)
+        return await signer.sign_transaction(tx_params=tx_params, private_key=self.client.account.key)
 
-    async def sign_and_send(self, tx_params: TxParams) -> Tx:
+    async def sign_and_send(self, tx_params: TxParams, on_signed: Callable[[Tx], Awaitable[None]] | None = None) -> Tx:
         """
         Sign and send a transaction. Additionally, add 'chainId', 'nonce', 'from', 'gasPrice' or
             'maxFeePerGas' + 'maxPriorityFeePerGas' and 'gas' parameters to transaction parameters if they are missing.
+            A missing nonce is allocated by the client's NonceManager and released again if the transaction is not broadcast.
 
         Args:
             tx_params (TxParams): parameters of the transaction.
+            on_signed (Optional[Callable[[Tx], Awaitable[None]]]): awaited with the signed transaction before it is broadcast,
+                e.g. to journal it. (None)
 
         Returns:
             Tx: the instance of the sent transaction.
 
         """
-        await self.auto_add_params(tx_params=tx_params)
+        nonce_manager = self.client.nonce_manager
+        allocated_nonce = None
+        if tx_params.get("nonce") is None:
+            allocated_nonce = tx_params["nonce"] = await nonce_manager.allocate(self.client)
 
-        signed_tx = await self.sign_transaction(tx_params)
+        signed_tx = None
+        try:
+            await self.auto_add_params(tx_params=tx_params)
 
-        tx_hash = await self.client.w3.eth.send_raw_transaction(transaction=signed_tx.rawTransaction)
+            signed_tx = await self.sign_transaction(tx_params)
+            if on_signed is not None:
+                await on_signed(Tx(tx_hash=signed_tx.hash, params=tx_params, raw_transaction=signed_tx.rawTransaction))
 
-        return Tx(tx_hash=tx_hash, params=tx_params)
+            tx_hash = await self.client.w3.eth.send_raw_transaction(transaction=signed_tx.rawTransaction)
+
+        except Exception as err:
+            if signed_tx is not None and is_already_known(err):
+                return Tx(tx_hash=signed_tx.hash, params=tx_params, raw_transaction=signed_tx.rawTransaction)
+
+            if is_out_of_gas(err):
+                gas_estimates.invalidate(self.client.network.chain_id, tx_params)
+
+            if is_nonce_too_low(err):
+                await nonce_manager.resync(self.client)
+            elif allocated_nonce is not None:
+                nonce_manager.release(allocated_nonce)
+            raise
+
+        return Tx(tx_hash=tx_hash, params=tx_params, raw_transaction=signed_tx.rawTransaction)
+
+    async def send_many(
+        self,
+        txs_params: list[TxParams],
+        wait: bool = True,
+        timeout: int | float = 180,
+        on_signed: Callable[[int, Tx], Awaitable[None]] | None = None,
+    ) -> list[Tx | Exception]:
+        """
+        Sign and send several independent transactions back-to-back with consecutive nonces, then wait for all receipts.
+
+        Missing parameters of all transactions are added concurrently and the nonces are assigned in list order by the
+        client's NonceManager (nonces in the params are ignored). Transactions that could not be prepared are skipped, so
+        the remaining ones still get consecutive nonces. If a broadcast fails, the following transactions are not sent and
+        their nonces are released. The receipts are awaited together through the client's ReceiptTracker.
+
+        Args:
+            txs_params (list[TxParams]): parameters of the transactions in the order they must be mined.
+            wait (bool): wait for the receipts. (True)
+            timeout (Union[int, float]): the receipt waiting timeout. (180 sec)
+            on_signed (Optional[Callable[[int, Tx], Awaitable[None]]]): awaited with the index and the signed transaction
+                before it is broadcast, e.g. to journal it. (None)
+
+        Returns:
+            list[Union[Tx, Exception]]: the sent transactions (with receipts if 'wait') or exceptions, in the input order.
+
+        """
+        results: list[Tx | Exception | None] = [None] * len(txs_params)
+        for tx_params in txs_params:
+            tx_params["nonce"] = None
+
+        prepared = await asyncio.gather(*(self.auto_add_params(tx_params=tx_params) for tx_params in txs_params), return_exceptions=True)
+        queue = []
+        for i, result in enumerate(prepared):
+            if isinstance(result, Exception):
+                results[i] = result
+            else:
+                queue.append(i)
+
+        nonce_manager = self.client.nonce_manager
+        nonces = [await nonce_manager.allocate(self.client) for _ in queue]
+        for i, nonce in zip(queue, nonces):
+            txs_params[i]["nonce"] = nonce
+
+        signed_txs = await asyncio.gather(*(self.sign_transaction(txs_params[i]) for i in queue), return_exceptions=True)
+
+        failed: Exception | None = None
+        resynced = False
+        for i, nonce, signed_tx in zip(queue, nonces, signed_txs):
+            if failed is None and isinstance(signed_tx, Exception):
+                failed = signed_tx
+
+            if failed is not None:
+                results[i] = failed
+                if not resynced:
+                    nonce_manager.release(nonce)
+                continue
+
+            try:
+                if on_signed is not None:
+                    await on_signed(i, Tx(tx_hash=signed_tx.hash, params=txs_params[i], raw_transaction=signed_tx.rawTransaction))
+
+                await self.client.w3.eth.send_raw_transaction(transaction=signed_tx.rawTransaction)
+                results[i] = Tx(tx_hash=signed_tx.hash, params=txs_params[i], raw_transaction=signed_tx.rawTransaction)
+
+            except Exception as err:
+                if is_already_known(err):
+                    results[i] = Tx(tx_hash=signed_tx.hash, params=txs_params[i], raw_transaction=signed_tx.rawTransaction)
+                    continue
+
+                failed = results[i] = err
+                if is_nonce_too_low(err):
+                    await nonce_manager.resync(self.client)
+                    resynced = True
+                else:
+                    nonce_manager.release(nonce)
+
+        if wait:
+            sent = [i for i, tx in enumerate(results) if isinstance(tx, Tx)]
+            receipts = await asyncio.gather(
+                *(results[i].wait_for_receipt(client=self.client, timeout=timeout) for i in sent), return_exceptions=True
+            )
+            for i, receipt in zip(sent, receipts):
+                if isinstance(receipt, Exception):
+                    results[i] = receipt
+
+        return results
+
+    async def wait_for_inclusion(
+        self,
+        tx: Tx,
+        timeout: int | float = 180,
+        policy: ReplacementPolicy = ReplacementPolicy(),
+        on_replaced: Callable[[Tx], Awaitable[None]] | None = None,
+    ) -> Tx:
+        """
+        Wait until the transaction or one of its replacements is mined, speeding it up whenever it stays pending for
+        'policy.stuck_blocks' new blocks.
+
+        Args:
+            tx (Tx): the sent transaction.
+            timeout (Union[int, float]): the overall waiting timeout. (180 sec)
+            policy (ReplacementPolicy): the replacement policy.
+            on_replaced (Optional[Callable[[Tx], Awaitable[None]]]): awaited with every replacement before it is broadcast. (None)
+
+        Returns:
+            Tx: the mined transaction (the original or a replacement) with its receipt.
+
+        """
+        tracker = self.client.receipts
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        waiters = {asyncio.ensure_future(tx.wait_for_receipt(client=self.client, timeout=timeout)): tx}
+        latest, bumps, pending_since = tx, 0, None
+        try:
+            while True:
+                done, _ = await asyncio.wait(waiters, timeout=tracker.poll_interval, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        return waiters[future]
+
+                    del waiters[future]
+                    if not waiters:
+                        raise future.exception()
+
+                if tracker.last_block is None:
+                    continue
+
+                if pending_since is None:
+                    pending_since = tracker.last_block
+
+                if tracker.last_block - pending_since < policy.stuck_blocks or bumps >= policy.max_bumps:
+                    continue
+
+                try:
+                    latest = await latest.speed_up(self.client, policy=policy, on_signed=on_replaced)
+                    bumps += 1
+                    pending_since = tracker.last_block
+                    waiters[asyncio.ensure_future(latest.wait_for_receipt(client=self.client, timeout=max(deadline - loop.time(), 1)))] = (
+                        latest
+                    )
+
+                except Exception as err:
+                    # e.g. the original got mined meanwhile ("nonce too low") or the bump was still underpriced
+                    logger.debug(f"Can not replace {latest.hash.hex()}: {err}")
+                    pending_since = tracker.last_block
+
+        finally:
+            for future in waiters:
+                if not future.done():
+                    future.cancel()
 
     async def approved_amount(self, token: types.Contract, spender: types.Contract, owner: types.Address | None = None) -> TokenAmount:
         """
@@ -254,11 +526,11 @@ class Transactions:
         if not owner:
             owner = self.client.account.address
 
-        return TokenAmount(
-            amount=await contract.functions.allowance(AsyncWeb3.to_checksum_address(owner), AsyncWeb3.to_checksum_address(spender)).call(),
-            decimals=await self.client.transactions.get_decimals(contract=contract.address),
-            wei=True,
+        amount, decimals = await asyncio.gather(
+            self.client.view(contract.functions.allowance(AsyncWeb3.to_checksum_address(owner), AsyncWeb3.to_checksum_address(spender))),
+            self.get_decimals(contract=contract.address),
         )
+        return TokenAmount(amount=amount, decimals=decimals, wei=True)
 
     @staticmethod
     async def wait_for_receipt(
@@ -318,8 +590,6 @@ class Transactions:
             "nonce": nonce,
             "to": contract.address,
             "data": contract.encode_abi("approve", args=tx_args.tuple()),
-            "maxFeePerGas": await self.client.w3.eth.max_priority_fee + Web3.to_wei(0.2, "gwei"),
-            "maxPriorityFeePerGas": await self.client.w3.eth.max_priority_fee,
         }
 
         if gas_limit:
@@ -331,8 +601,42 @@ class Transactions:
 
     async def get_decimals(self, contract: types.Contract) -> int:
         contract_address, abi = await self.client.contracts.get_contract_attributes(contract)
-        contract = await self.client.contracts.default_token(contract_address=contract_address)
-        return await contract.functions.decimals().call()
+        key = f"{self.client.network.chain_id}:{contract_address}"
+        decimals = chain_data.get("decimals", key)
+        if decimals is None:
+            contract = await self.client.contracts.default_token(contract_address=contract_address)
+            decimals = await self.client.view(contract.functions.decimals())
+            chain_data.set("decimals", key, decimals)
+        return decimals
+
+    async def get_receipt(self, tx_hash: str | _Hash32, finality_blocks: int = 64) -> dict[str, Any] | None:
+        """
+        Get a transaction receipt. Receipts buried under at least 'finality_blocks' blocks are stored in the immutable cache.
+
+        Args:
+            tx_hash (Union[str, _Hash32]): the transaction hash.
+            finality_blocks (int): how many blocks on top make the receipt final. (64)
+
+        Returns:
+            Optional[Dict[str, Any]]: the transaction receipt or None if the transaction is not mined yet.
+
+        """
+        key = receipt_key(self.client.network.chain_id, tx_hash)
+        cached = chain_data.get("receipt", key)
+        if cached is not None:
+            return load_receipt(cached)
+
+        async with self.client.batch() as batch:
+            receipt = batch.get_transaction_receipt(tx_hash)
+            block_number = batch.block_number()
+
+        receipt = receipt.result()
+        if not receipt:
+            return None
+
+        if block_number.result() - receipt["blockNumber"] >= finality_blocks:
+            chain_data.set("receipt", key, dump_receipt(receipt))
+        return dict(receipt)
 
     async def sign_message(self):
         pass
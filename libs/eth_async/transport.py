@@ -0,0 +1,487 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiohttp import ClientConnectionError, ClientPayloadError, ClientResponseError, ClientSession, ClientTimeout, TCPConnector
+from web3 import Web3
+from web3.types import RPCEndpoint, RPCResponse
+
+WRITE_METHODS = ("eth_sendRawTransaction", "eth_sendTransaction")
+
+
+def is_failover_error(err: BaseException) -> bool:
+    """
+    Whether a request error is the endpoint's fault (rate limit, server error, dead connection or timeout), so the same
+    request may be sent to another endpoint.
+    """
+    if isinstance(err, ClientResponseError):
+        return err.status == 429 or err.status >= 500
+    return isinstance(err, (ClientConnectionError, ClientPayloadError, asyncio.TimeoutError))
+
+
+@dataclass
+class TransportStats:
+    """
+    Usage counters of a single pooled transport.
+
+    Attributes:
+        endpoint_uri (str): the RPC URL.
+        proxy (str | None): the proxy the connections are opened through.
+        limit (int): the maximum number of open connections.
+        clients (int): how many providers were attached to the transport.
+        requests (int): how many HTTP requests were sent.
+        successes (int): how many HTTP requests succeeded.
+        errors (int): how many HTTP requests failed.
+        in_flight (int): how many HTTP requests are being processed right now.
+        peak_in_flight (int): the highest observed in_flight value.
+        total_latency (float): the sum of request durations in seconds.
+        latencies (deque[float]): durations of the latest successful requests, used for the p95 latency.
+
+    """
+
+    endpoint_uri: str
+    proxy: str | None
+    limit: int
+    clients: int = 0
+    requests: int = 0
+    successes: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    total_latency: float = 0.0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=200), repr=False)
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.0
+
+    @property
+    def success_rate(self) -> float:
+        finished = self.successes + self.errors
+        return self.successes / finished if finished else 1.0
+
+    @property
+    def p95_latency(self) -> float | None:
+        if len(self.latencies) < 20:
+            return None
+        return statistics.quantiles(self.latencies, n=20)[-1]
+
+    def __str__(self) -> str:
+        p95 = self.p95_latency
+        return (
+            f"{self.endpoint_uri} | proxy: {self.proxy or '-'} | clients: {self.clients} | requests: {self.requests} | "
+            f"errors: {self.errors} | success: {self.success_rate:.1%} | in flight: {self.in_flight}/{self.limit} "
+            f"(peak {self.peak_in_flight}) | avg latency: {self.avg_latency:.3f}s | p95: {f'{p95:.3f}s' if p95 else '-'}"
+        )
+
+
+class RPCTransport:
+    """
+    A keep-alive HTTP connection pool to one RPC endpoint, opened through one proxy.
+
+    The transport also keeps the health of the endpoint for EndpointPool: an EWMA of the request latency and, after
+    'max_failures' consecutive failover errors, a cooldown that doubles with every further failure (up to 'max_cooldown').
+    """
+
+    ewma_alpha = 0.2
+    max_failures = 3
+    base_cooldown = 5.0
+    max_cooldown = 120.0
+
+    def __init__(
+        self, endpoint_uri: str, proxy: str | None = None, limit: int = 20, keepalive_timeout: float = 60, timeout: float = 360
+    ) -> None:
+        self.endpoint_uri = endpoint_uri
+        self.proxy = proxy
+        self.limit = limit
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.stats = TransportStats(endpoint_uri=endpoint_uri, proxy=proxy, limit=limit)
+        self.supports_batch: bool | None = None
+        self.ewma_latency: float | None = None
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self._session: ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def score(self) -> float:
+        """
+        The expected request latency in seconds, penalised by recent failures. Lower is better.
+        """
+        latency = self.ewma_latency if self.ewma_latency is not None else 0.5
+        return latency * (1 + self.consecutive_failures)
+
+    def _record_success(self, latency: float) -> None:
+        self.stats.successes += 1
+        self.stats.latencies.append(latency)
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency += self.ewma_alpha * (latency - self.ewma_latency)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def _record_failure(self, err: BaseException) -> None:
+        self.stats.errors += 1
+        if not is_failover_error(err):
+            return
+
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.max_failures:
+            cooldown = self.base_cooldown * 2 ** (self.consecutive_failures - self.max_failures)
+            self.cooldown_until = time.monotonic() + min(cooldown, self.max_cooldown)
+
+    async def _get_session(self) -> ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._loop is not loop:
+            await self._close_stale_session()
+
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(
+                connector=TCPConnector(limit=self.limit, keepalive_timeout=self.keepalive_timeout, ttl_dns_cache=300),
+                timeout=ClientTimeout(total=self.timeout),
+                raise_for_status=True,
+            )
+            self._loop = loop
+        return self._session
+
+    async def _close_stale_session(self) -> None:
+        """
+        Close the session opened on another event loop (an earlier asyncio.run() or another thread).
+        """
+        session, loop = self._session, self._loop
+        self._session = None
+        self._loop = None
+        if session.closed:
+            return
+
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            # the connections of a closed loop are already gone, this only marks the session closed
+            await session.close()
+
+    async def request(self, payload: bytes | dict | list, headers: dict | None = None, write: bool = False) -> bytes:
+        """
+        POST a JSON-RPC payload to the endpoint.
+
+        :param bytes | dict | list payload: an encoded request or a JSON-serializable request (or batch)
+        :param dict | None headers: request headers
+        :param bool write: whether the payload broadcasts a transaction (only used by EndpointPool routing)
+        :return bytes: the raw response body
+        """
+        if not isinstance(payload, bytes):
+            payload = json.dumps(payload).encode()
+
+        session = await self._get_session()
+        stats = self.stats
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        started = time.perf_counter()
+        try:
+            async with session.post(self.endpoint_uri, data=payload, headers=headers, proxy=self.proxy) as response:
+                body = await response.read()
+            self._record_success(time.perf_counter() - started)
+            return body
+
+        except Exception as err:
+            self._record_failure(err)
+            raise
+
+        finally:
+            stats.in_flight -= 1
+            stats.total_latency += time.perf_counter() - started
+
+    async def request_json(self, payload: bytes | dict | list, headers: dict | None = None) -> Any:
+        return json.loads(await self.request(payload=payload, headers=headers))
+
+    async def close(self) -> None:
+        if self._session is not None and self._loop is not asyncio.get_running_loop():
+            await self._close_stale_session()
+        elif self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+class EndpointPool:
+    """
+    Several RPC endpoints of one network, opened through one proxy, used as a single transport.
+
+    Reads go to the healthy endpoint with the best score and fail over to the next one on rate limits, server errors,
+    dead connections and timeouts. With 'hedge' enabled a read that is still pending after the endpoint's p95 latency
+    (or 'hedge_delay' until enough latencies are known) is sent to the second-best endpoint too, and the first answer
+    wins. Writes are never hedged and stick to the endpoint that accepted the previous write while it stays healthy, so
+    transactions of a wallet reach the mempool through the same node.
+    """
+
+    def __init__(
+        self, transports: list[RPCTransport], hedge: bool = False, hedge_delay: float = 1.0, min_hedge_delay: float = 0.05
+    ) -> None:
+        self.transports = transports
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.supports_batch: bool | None = None
+        self.clients = 0
+        self.failovers = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._write_transport: RPCTransport | None = None
+
+    @property
+    def endpoint_uri(self) -> str:
+        return self.transports[0].endpoint_uri
+
+    @property
+    def proxy(self) -> str | None:
+        return self.transports[0].proxy
+
+    @property
+    def stats(self) -> TransportStats:
+        """
+        The counters of all endpoints added up (the peak is the sum of the endpoints' peaks).
+        """
+        stats = TransportStats(endpoint_uri=self.endpoint_uri, proxy=self.proxy, limit=0, clients=self.clients)
+        for transport in self.transports:
+            stats.limit += transport.stats.limit
+            stats.requests += transport.stats.requests
+            stats.successes += transport.stats.successes
+            stats.errors += transport.stats.errors
+            stats.in_flight += transport.stats.in_flight
+            stats.peak_in_flight += transport.stats.peak_in_flight
+            stats.total_latency += transport.stats.total_latency
+            stats.latencies.extend(transport.stats.latencies)
+        return stats
+
+    def ranked(self) -> list[RPCTransport]:
+        """
+        Get the endpoints ordered by preference: healthy ones by score, then the ones in cooldown by cooldown end.
+        """
+        healthy = sorted((t for t in self.transports if t.healthy), key=lambda t: t.score)
+        cooling = sorted((t for t in self.transports if not t.healthy), key=lambda t: t.cooldown_until)
+        return healthy + cooling
+
+    async def request(self, payload: bytes | dict | list, headers: dict | None = None, write: bool = False) -> bytes:
+        """
+        POST a JSON-RPC payload to the best endpoint.
+
+        :param bytes | dict | list payload: an encoded request or a JSON-serializable request (or batch)
+        :param dict | None headers: request headers
+        :param bool write: whether the payload broadcasts a transaction
+        :return bytes: the raw response body
+        """
+        if not isinstance(payload, bytes):
+            payload = json.dumps(payload).encode()
+
+        candidates = self.ranked()
+        if write:
+            if self._write_transport in candidates and self._write_transport.healthy:
+                candidates.remove(self._write_transport)
+                candidates.insert(0, self._write_transport)
+
+            transport, body = await self._failover(candidates, payload=payload, headers=headers)
+            self._write_transport = transport
+            return body
+
+        if self.hedge and len(candidates) > 1:
+            return await self._hedged(candidates, payload=payload, headers=headers)
+
+        _, body = await self._failover(candidates, payload=payload, headers=headers)
+        return body
+
+    async def _failover(self, candidates: list[RPCTransport], payload: bytes, headers: dict | None) -> tuple[RPCTransport, bytes]:
+        last_err: BaseException | None = None
+        for i, transport in enumerate(candidates):
+            if i:
+                self.failovers += 1
+            try:
+                return transport, await transport.request(payload=payload, headers=headers)
+
+            except Exception as err:
+                if not is_failover_error(err):
+                    raise
+                last_err = err
+
+        raise last_err
+
+    async def _hedged(self, candidates: list[RPCTransport], payload: bytes, headers: dict | None) -> bytes:
+        primary, secondary = candidates[0], candidates[1]
+        delay = max(primary.stats.p95_latency or self.hedge_delay, self.min_hedge_delay)
+        first = asyncio.ensure_future(primary.request(payload=payload, headers=headers))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedged += 1
+                tasks.add(asyncio.ensure_future(secondary.request(payload=payload, headers=headers)))
+
+            last_err: BaseException | None = None
+            pending = tasks
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+
+                    if not is_failover_error(task.exception()):
+                        raise task.exception()
+                    last_err = task.exception()
+
+            rest = candidates[len(tasks) :]
+            if not rest:
+                raise last_err
+            self.failovers += 1
+            _, body = await self._failover(rest, payload=payload, headers=headers)
+            return body
+
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def request_json(self, payload: bytes | dict | list, headers: dict | None = None) -> Any:
+        return json.loads(await self.request(payload=payload, headers=headers))
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (
+            f"{self.endpoint_uri} pool | endpoints: {len(self.transports)} | clients: {stats.clients} | requests: {stats.requests} | "
+            f"success: {stats.success_rate:.1%} | failovers: {self.failovers} | hedged: {self.hedged} (won {self.hedge_wins})"
+        )
+
+
+class PooledHTTPProvider(Web3.AsyncHTTPProvider):
+    """
+    An AsyncHTTPProvider that sends requests through a shared RPCTransport (or EndpointPool) instead of its own session.
+    """
+
+    def __init__(self, transport: RPCTransport | EndpointPool, headers: dict | None = None) -> None:
+        super().__init__(endpoint_uri=transport.endpoint_uri, request_kwargs={"headers": headers} if headers else None)
+        self.transport = transport
+        self.headers = headers
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        request_data = self.encode_rpc_request(method, params)
+        raw_response = await self.transport.request(payload=request_data, headers=self.headers, write=method in WRITE_METHODS)
+        return self.decode_rpc_response(raw_response)
+
+
+class TransportRegistry:
+    """
+    A process-wide registry of RPCTransport instances keyed by (RPC URL, proxy).
+
+    Every Client asks the registry for its provider, so all wallets that talk to the same RPC through the same proxy share
+    one pool of warm connections. Networks with several RPC URLs get an EndpointPool over the transports of those URLs.
+    """
+
+    def __init__(
+        self,
+        limit_per_endpoint: int = 20,
+        keepalive_timeout: float = 60,
+        timeout: float = 360,
+        hedge: bool = False,
+        hedge_delay: float = 1.0,
+    ) -> None:
+        self.limit_per_endpoint = limit_per_endpoint
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self._transports: dict[tuple[str, str | None], RPCTransport] = {}
+        self._pools: dict[tuple[tuple[str, ...], str | None], EndpointPool] = {}
+
+    def configure(self, hedge: bool | None = None, hedge_delay: float | None = None) -> None:
+        """
+        Change the hedging of reads, for the existing endpoint pools too.
+
+        :param bool | None hedge: whether to send slow reads to a second endpoint
+        :param float | None hedge_delay: seconds to wait before hedging while the p95 latency of the endpoint is unknown
+        """
+        if hedge is not None:
+            self.hedge = hedge
+        if hedge_delay is not None:
+            self.hedge_delay = hedge_delay
+        for pool in self._pools.values():
+            pool.hedge = self.hedge
+            pool.hedge_delay = self.hedge_delay
+
+    def get(self, endpoint_uri: str, proxy: str | None = None) -> RPCTransport:
+        key = (endpoint_uri, proxy)
+        transport = self._transports.get(key)
+        if transport is None:
+            transport = RPCTransport(
+                endpoint_uri=endpoint_uri,
+                proxy=proxy,
+                limit=self.limit_per_endpoint,
+                keepalive_timeout=self.keepalive_timeout,
+                timeout=self.timeout,
+            )
+            self._transports[key] = transport
+        return transport
+
+    def pool(self, endpoint_uris: list[str] | tuple[str, ...], proxy: str | None = None) -> EndpointPool:
+        key = (tuple(endpoint_uris), proxy)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = EndpointPool(
+                transports=[self.get(endpoint_uri=uri, proxy=proxy) for uri in endpoint_uris],
+                hedge=self.hedge,
+                hedge_delay=self.hedge_delay,
+            )
+            self._pools[key] = pool
+        return pool
+
+    def provider(self, endpoint_uri: str | list[str], proxy: str | None = None, headers: dict | None = None) -> PooledHTTPProvider:
+        if isinstance(endpoint_uri, str) or len(endpoint_uri) == 1:
+            transport = self.get(endpoint_uri=endpoint_uri if isinstance(endpoint_uri, str) else endpoint_uri[0], proxy=proxy)
+            transport.stats.clients += 1
+        else:
+            transport = self.pool(endpoint_uris=endpoint_uri, proxy=proxy)
+            transport.clients += 1
+        return PooledHTTPProvider(transport=transport, headers=headers)
+
+    def stats(self) -> list[TransportStats]:
+        return [transport.stats for transport in self._transports.values()]
+
+    def summary(self) -> str:
+        stats = self.stats()
+        requests = sum(s.requests for s in stats)
+        errors = sum(s.errors for s in stats)
+        in_flight = sum(s.in_flight for s in stats)
+        failovers = sum(pool.failovers for pool in self._pools.values())
+        return (
+            f"RPC transports: {len(stats)} pools | requests: {requests} | errors: {errors} | in flight: {in_flight} | "
+            f"failovers: {failovers}"
+        )
+
+    def report(self) -> str:
+        """
+        Per-endpoint success and latency, one line per (RPC URL, proxy).
+        """
+        lines = [str(s) for s in self.stats()]
+        lines.extend(pool.summary() for pool in self._pools.values())
+        return "\n".join(lines)
+
+    async def close_all(self) -> None:
+        for transport in self._transports.values():
+            await transport.close()
+        self._transports.clear()
+        self._pools.clear()
+
+
+transports = TransportRegistry()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from typing import TYPE_CHECKING
 
 from eth_typing import ChecksumAddress
@@ -34,11 +35,11 @@ class Wallet:
 
         contract = await self.client.contracts.default_token(contract_address=Web3.to_checksum_address(token_address))
 
-        return TokenAmount(
-            amount=await contract.functions.balanceOf(address).call(),
-            decimals=await self.client.transactions.get_decimals(contract=contract.address),
-            wei=True,
+        amount, decimals = await asyncio.gather(
+            self.client.view(contract.functions.balanceOf(address)),
+            self.client.transactions.get_decimals(contract=contract.address),
         )
+        return TokenAmount(amount=amount, decimals=decimals, wei=True)
 
     async def nonce(self, address: ChecksumAddress | None = None) -> int:
         if not address:
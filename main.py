@@ -9,6 +9,7 @@ from rich.console import Console
 from check_python import check_python_version
 from data.constants import PROJECT_NAME
 from functions.activity import activity
+from libs.eth_async.transport import transports
 from utils.create_files import create_files, reset_folder
 from utils.db_import_export_sync import Export, Import, Sync
 from utils.git_version import check_for_updates
@@ -108,7 +109,10 @@ async def main():
     create_files()
 
     await check_for_updates(repo_name=PROJECT_NAME)
-    await choose_action()
+    try:
+        await choose_action()
+    finally:
+        await transports.close_all()
 
 
 if __name__ == "__main__":
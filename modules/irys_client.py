@@ -227,7 +227,7 @@ class Irys(Base):
         data = request.json()
         if request.status_code == 200 and data["success"]:
             logger.success(f"{self.wallet} success play game with {wpm} wpm")
-            return add_count_game(address=self.wallet.address)
+            return await add_count_game(address=self.wallet.address)
         elif "error" in data and "Hourly" in data["error"]:
             logger.warning(f"{self.wallet} already play in this hour more > 10 type games")
             return "Hour"
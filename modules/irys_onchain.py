@@ -28,14 +28,12 @@ class IrysOnchain(Base):
         if balance and not Settings().multiple_mint:
             logger.debug(f"{self.wallet} already have {balance} NFT and Multiple Mint Off")
             return
-        if balance_in_irys.Ether < TokenAmount(amount=0.001).Ether:
+        if balance_in_irys < TokenAmount(amount=0.001):
             logger.warning(f"{self.wallet} balance not enough for mint Irys x OmniHub NFT")
             return
         data = "0xa25ffea800000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000800000000000000000000000000000000000000000000000000000000000000000"
         mint_value = TokenAmount(amount=1000000000000000, wei=True)
-        tx_params = TxParams(to=contract.address, data=data, value=mint_value.Wei)
-
-        result = await self.execute_transaction(tx_params=tx_params, activity_type="Mint Irys x OmniHub NFT")
+        transactions = [(TxParams(to=contract.address, data=data, value=mint_value.Wei), "Mint Irys x OmniHub NFT")]
 
         contract = await self.client.contracts.get(Contracts.IRYS_WEEP_NFT)
         clear_address = str(self.client.account.address)[2:].lower()
@@ -43,17 +41,22 @@ class IrysOnchain(Base):
         tx_params = TxParams(to=contract.address, data=data)
 
         try:
-            estimate_gas = await self.client.transactions.auto_add_params(tx_params=tx_params)
+            # the estimate is the eligibility check (it reverts with > 20 NFTs), so it must not come from the cache
+            estimate_gas = await self.client.transactions.auto_add_params(tx_params=tx_params, use_cache=False)
             logger.debug(estimate_gas)
+            transactions.append((tx_params, "Mint Irys Weep NFT"))
         except Exception:
             logger.debug(f"{self.wallet} have > 20 Irys Weep NFT.")
-            return True
-        result = await self.execute_transaction(tx_params=tx_params, activity_type="Mint Irys Weep NFT")
 
-        if result.success:
-            return result.tx_hash
-        else:
-            raise Exception(f"Error Mint Irys x Weep NFT: {result.error_message}")
+        # both mints are independent, so they are sent back-to-back and confirmed in the same block
+        results = await self.execute_transactions(transactions)
+        for (_, activity_type), result in zip(transactions, results):
+            if not result.success:
+                raise Exception(f"Error {activity_type}: {result.error_message}")
+
+        if len(results) == 1:
+            return True
+        return results[-1].tx_hash
 
     @async_retry()
     async def irys_faucet(self):
@@ -67,7 +70,7 @@ class IrysOnchain(Base):
         }
         response = await self.browser.post(url="https://irys.xyz/api/faucet", json=json_data)
         data = response.json()
-        last_faucet_claim(address=self.wallet.address, last_faucet_claim=datetime.utcnow())
+        await last_faucet_claim(address=self.wallet.address, last_faucet_claim=datetime.utcnow())
         if data["success"]:
             logger.success(f"{self.wallet} success get Irys Token from Faucet")
             return await self.wait_deposit(start_balance=balance_in_irys)
@@ -99,18 +102,17 @@ class IrysOnchain(Base):
     async def handle_balance(self):
         balance_in_platform = await self.check_platform_balance()
         logger.debug(balance_in_platform)
-        if balance_in_platform.Ether > 0.001:
+        if balance_in_platform > TokenAmount(amount=0.001):
             return True
         balance_in_irys = await self.client.wallet.balance()
         logger.debug(balance_in_irys)
-        if balance_in_irys.Ether < 0.01:
+        if balance_in_irys < TokenAmount(amount=0.01):
             faucet = await self.irys_faucet()
             if faucet:
                 return await self.handle_balance()
             else:
                 return False
-        amount = float(balance_in_irys.Ether) * 0.9
-        amount = TokenAmount(amount=amount)
+        amount = balance_in_irys * 0.9
         return await self.bridge_to_platform(amount=amount)
 
     async def bridge_to_platform(self, amount: TokenAmount):
@@ -127,5 +129,5 @@ class IrysOnchain(Base):
 
     async def check_platform_balance(self):
         contract = await self.client.contracts.get(Contracts.IRYS)
-        balance = await contract.functions.getUserBalance(self.client.account.address).call()
+        balance = await self.client.view(contract.functions.getUserBalance(self.client.account.address))
         return TokenAmount(balance, wei=True)
@@ -21,8 +21,8 @@ class Quests(Irys):
 
     async def update_points(self, galxe_client):
         points, rank = await galxe_client.update_points_and_rank(campaign_id=58934)
-        update_points(address=self.wallet.address, points=points)
-        update_rank(address=self.wallet.address, rank=rank)
+        await update_points(address=self.wallet.address, points=points)
+        await update_rank(address=self.wallet.address, rank=rank)
         logger.info(f"{self.wallet} have {self.wallet.points} points and rank {self.wallet.rank} in Galxe")
 
     async def complete_irys_other_games_quests(self, galxe_client: GalxeClient):
@@ -293,7 +293,7 @@ class Quests(Irys):
         for network in network_values:
             if network.name in Settings().network_for_bridge:
                 try:
-                    client = Client(private_key=self.client.account._private_key.hex(), network=network, proxy=self.client.proxy)
+                    client = self.client.on(network)
                     balance = await client.wallet.balance()
                     if balance.Ether > Settings().random_eth_for_bridge_max:
                         return True
@@ -0,0 +1,153 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from loguru import logger
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class AsyncDB:
+    def __init__(self, db_url: str, **kwargs):
+        """
+        Initializes a class. The DB work runs in the aiosqlite worker threads, every call uses its own session.
+
+        :param str db_url: a URL containing all the necessary parameters to connect to a DB (e.g. 'sqlite+aiosqlite:///file.db')
+        """
+        self.db_url = db_url
+        self.engine = create_async_engine(self.db_url, **kwargs)
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.remote: Callable[[Any, dict, Any], Awaitable[Any]] | None = None
+
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine.sync_engine, "connect", self._set_sqlite_pragmas)
+
+    @staticmethod
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Opens a session that is committed on exit and rolled back on errors.
+        """
+        async with self.sessionmaker() as session:
+            try:
+                yield session
+                await session.commit()
+
+            except DatabaseError:
+                await session.rollback()
+                raise
+
+    async def all(self, entities=None, *criterion, stmt=None, order_by=None) -> list:
+        """
+        Fetches all rows.
+
+        :param entities: an ORM entity
+        :param stmt: stmt
+        :param criterion: criterion for rows filtering
+        :return list: the list of rows
+        """
+        if stmt is None:
+            if not entities:
+                return []
+
+            stmt = select(entities).filter(*criterion)
+            if order_by is not None:
+                stmt = stmt.order_by(order_by)
+
+        async with self.session() as session:
+            return list((await session.scalars(stmt)).all())
+
+    async def one(self, entities=None, *criterion, stmt=None, from_the_end: bool = False):
+        """
+        Fetches one row.
+
+        :param entities: an ORM entity
+        :param stmt: stmt
+        :param criterion: criterion for rows filtering
+        :param from_the_end: get the row from the end
+        :return list: found row or None
+        """
+        rows = await self.all(entities, *criterion, stmt=stmt)
+        if rows:
+            return rows[-1] if from_the_end else rows[0]
+
+        return None
+
+    async def insert(self, row: object | list[object]):
+        """
+        Inserts rows.
+
+        :param Union[object, list[object]] row: an ORM entity or list of entities
+        """
+        try:
+            async with self.session() as session:
+                if isinstance(row, list):
+                    session.add_all(row)
+                else:
+                    session.add(row)
+
+        except DatabaseError as e:
+            logger.error(e)
+
+    async def update(self, entity, *criterion, values: dict) -> list[int]:
+        """
+        Updates rows with a single UPDATE statement.
+
+        :param entity: an ORM entity
+        :param criterion: criterion for rows filtering
+        :param dict values: new column values (SQL expressions are allowed)
+        :return list[int]: primary keys of the updated rows
+        """
+        stmt = update(entity).where(*criterion).values(**values).returning(*entity.__mapper__.primary_key)
+        try:
+            async with self.session() as session:
+                return list((await session.scalars(stmt)).all())
+
+        except DatabaseError as e:
+            logger.error(e)
+            return []
+
+    async def write_row(self, entity, values: dict, pk=None):
+        """
+        Inserts a row or updates the row with the primary key, with one statement.
+
+        If 'remote' is set (in a worker process of the sharded runner), the write is sent to it and done by the process
+        that owns the database; the call returns when the write is committed there.
+
+        :param entity: an ORM entity
+        :param dict values: column values
+        :param pk: the primary key of the row to update (None - insert a new row)
+        :return: the primary key of the row or None if the write failed
+        """
+        if self.remote is not None:
+            return await self.remote(entity, values, pk)
+
+        pk_column = entity.__mapper__.primary_key[0]
+        if pk is None:
+            stmt = insert(entity).values(**values).returning(pk_column)
+        else:
+            stmt = update(entity).where(pk_column == pk).values(**values).returning(pk_column)
+
+        try:
+            async with self.session() as session:
+                return (await session.execute(stmt)).scalar()
+
+        except DatabaseError as e:
+            logger.error(e)
+            return None
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
@@ -179,3 +179,10 @@ class DB:
                 logger.warning(f"[schema] '{table_name}.{col.name}' NOT NULL without DEFAULT → adding as NULLABLE")
 
             self.add_column_to_table(table_name=table_name, column_name=col.name, column_type=col_type_sql, default_value=default_val)
+
+    def ensure_model_indexes(self, model) -> None:
+        """
+        Creating indexes of an ORM-model missed in an existing SQLite table (create_all only indexes new tables).
+        """
+        for index in model.__table__.indexes:
+            index.create(self.engine, checkfirst=True)
@@ -1,5 +1,6 @@
 from datetime import datetime
 
+from sqlalchemy import UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 from data.constants import PROJECT_SHORT_NAME
@@ -25,11 +26,55 @@ class Wallet(Base):
     points: Mapped[int] = mapped_column(nullable=True, default=None)
     rank: Mapped[int] = mapped_column(nullable=True, default=None)
     completed: Mapped[bool] = mapped_column(default=False)
-    next_action_time: Mapped[datetime] = mapped_column(default=datetime.now)
-    next_game_action_time: Mapped[datetime] = mapped_column(default=datetime.now)
+    next_action_time: Mapped[datetime] = mapped_column(default=datetime.now, index=True)
+    next_game_action_time: Mapped[datetime] = mapped_column(default=datetime.now, index=True)
     last_faucet_claim: Mapped[datetime | None] = mapped_column(default=None)
 
     def __repr__(self):
         if Settings().show_wallet_address_logs:
             return f"[{PROJECT_SHORT_NAME} | {self.id} | {self.address}]"
         return f"[{PROJECT_SHORT_NAME} | {self.id}]"
+
+
+class TxJournal(Base):
+    __tablename__ = "tx_journal"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    intent_key: Mapped[str] = mapped_column(index=True)
+    chain_id: Mapped[int] = mapped_column(nullable=False)
+    address: Mapped[str] = mapped_column(nullable=False)
+    nonce: Mapped[int] = mapped_column(nullable=False)
+    tx_hash: Mapped[str] = mapped_column(nullable=False)
+    raw_tx: Mapped[str] = mapped_column(nullable=False)
+    replaced_hashes: Mapped[str] = mapped_column(default="")
+    status: Mapped[str] = mapped_column(default="signed", index=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.now)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.now)
+
+    @property
+    def hashes(self) -> list[str]:
+        return [self.tx_hash] + [tx_hash for tx_hash in self.replaced_hashes.split(",") if tx_hash]
+
+    def __repr__(self):
+        return f"[{self.intent_key} | nonce {self.nonce} | {self.tx_hash} | {self.status}]"
+
+
+class Allowance(Base):
+    __tablename__ = "allowances"
+    __table_args__ = (UniqueConstraint("chain_id", "owner", "token", "spender"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    chain_id: Mapped[int] = mapped_column(nullable=False)
+    owner: Mapped[str] = mapped_column(nullable=False)
+    token: Mapped[str] = mapped_column(nullable=False)
+    spender: Mapped[str] = mapped_column(nullable=False)
+    # uint256 does not fit into an SQLite integer
+    amount: Mapped[str] = mapped_column(nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.now)
+
+    @property
+    def wei(self) -> int:
+        return int(self.amount)
+
+    def __repr__(self):
+        return f"[{self.chain_id} | {self.owner} -> {self.spender} | {self.token} | {self.amount}]"
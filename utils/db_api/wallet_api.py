@@ -1,6 +1,16 @@
+import random
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
 from data.config import WALLETS_DB
+from utils.db_api.async_db import AsyncDB
 from utils.db_api.db import DB
-from utils.db_api.models import Base, Wallet
+from utils.db_api.models import Allowance, Base, TxJournal, Wallet
+from utils.db_api.write_behind import Increment, WriteBehindBuffer
 
 
 def get_wallets(sqlite_query: bool = False) -> list[Wallet]:
@@ -24,7 +34,133 @@ def get_wallet_by_address(address: str, sqlite_query: bool = False) -> Wallet |
     return db.one(Wallet, Wallet.address == address)
 
 
-def update_twitter_token(address: str, updated_token: str | None) -> bool:
+def wallet_selection(range_wallets: list | None = None, exact_wallets: tuple | list = ()) -> list:
+    """
+    Builds the SQL criterion of the wallets to run. Wallets are numbered from 1 in id order, as in the settings.
+
+    :param list | None range_wallets: [start, end] positions, [0, 0] - all wallets
+    :param tuple | list exact_wallets: positions to run, used only without a range
+    :return list: the criterion (empty - all wallets)
+    """
+    numbered = select(Wallet.id, func.row_number().over(order_by=Wallet.id).label("position")).subquery()
+    if range_wallets and list(range_wallets) != [0, 0]:
+        start, end = range_wallets
+        positions = numbered.c.position.between(start, end)
+    elif exact_wallets:
+        positions = numbered.c.position.in_(list(exact_wallets))
+    else:
+        return []
+
+    return [Wallet.id.in_(select(numbered.c.id).where(positions))]
+
+
+async def count_wallets(*criterion) -> int:
+    return (await adb.all(stmt=select(func.count(Wallet.id)).where(*criterion)))[0]
+
+
+async def _load_wallets(stmt) -> list[Wallet]:
+    # the wallets are read through the async engine and attached to the synchronous session without another query,
+    # so updates find them in its identity map (see _update_wallet)
+    return [db.s.merge(wallet, load=False) for wallet in await adb.all(stmt=stmt)]
+
+
+async def stream_wallets(*criterion, page_size: int = 200, shuffle: bool = False) -> AsyncIterator[Wallet]:
+    """
+    Yields the selected wallets page by page, so only one page of Wallet objects is held in memory. Pages are read with
+    keyset pagination by id; with 'shuffle' the ids of all selected wallets are read and shuffled first and the wallets
+    are loaded in that order, so the whole selection is shuffled as before.
+
+    :param criterion: criterion for rows filtering
+    :param int page_size: the number of wallets read at once
+    :param bool shuffle: yield the wallets in random order
+    """
+    if shuffle:
+        wallet_ids = await adb.all(stmt=select(Wallet.id).where(*criterion))
+        random.shuffle(wallet_ids)
+        for start in range(0, len(wallet_ids), page_size):
+            page = wallet_ids[start : start + page_size]
+            wallets = await load_wallets(page)
+            for wallet_id in page:
+                if wallet_id in wallets:
+                    yield wallets[wallet_id]
+        return
+
+    last_id = 0
+    while True:
+        wallets = await _load_wallets(select(Wallet).where(Wallet.id > last_id, *criterion).order_by(Wallet.id).limit(page_size))
+        if not wallets:
+            return
+
+        last_id = wallets[-1].id
+        for wallet in wallets:
+            yield wallet
+
+
+async def load_wallets(wallet_ids: list[int]) -> dict[int, Wallet]:
+    """
+    Loads wallets by id through the async engine and attaches them to the synchronous session.
+
+    :param list[int] wallet_ids: the ids of the wallets
+    :return dict[int, Wallet]: the found wallets by id
+    """
+    return {wallet.id: wallet for wallet in await _load_wallets(select(Wallet).where(Wallet.id.in_(wallet_ids)))}
+
+
+def _loaded_wallet(key_column: str, key) -> Wallet | None:
+    if key_column == "id":
+        return db.s.identity_map.get(identity_key(Wallet, key))
+
+    wallet_id = _wallet_ids.get(key)
+    if wallet_id is None:
+        _wallet_ids.update({wallet.address: wallet.id for wallet in list(db.s.identity_map.values()) if isinstance(wallet, Wallet)})
+        wallet_id = _wallet_ids.get(key)
+
+    return db.s.identity_map.get(identity_key(Wallet, wallet_id)) if wallet_id is not None else None
+
+
+async def _find_wallet_id(key_column: str, key) -> int | None:
+    if key_column == "id" and (key in _existing_wallets or wallet_writes.is_pending("id", key)):
+        return key
+    if key_column == "address" and key in _wallet_ids:
+        return _wallet_ids[key]
+
+    wallet_id = await adb.one(stmt=select(Wallet.id).where(getattr(Wallet, key_column) == key))
+    if wallet_id is None:
+        return None
+
+    _existing_wallets.add(wallet_id)
+    if key_column == "address":
+        _wallet_ids[key] = wallet_id
+    return wallet_id
+
+
+async def _update_wallet(key_column: str, key, **values) -> bool:
+    """
+    Queues wallet column updates in the write-behind buffer and applies the new values to the matching Wallet object
+    already loaded by the synchronous session, so the rest of the software sees its own writes.
+
+    Updates are queued by wallet id whatever the key is, so every row has one pending entry and updates by address and
+    by id of the same column are written in the order they were made.
+
+    :return bool: False if there is no such wallet (nothing is queued)
+    """
+    wallet = _loaded_wallet(key_column, key)
+    wallet_id = wallet.id if wallet is not None else await _find_wallet_id(key_column, key)
+    if wallet_id is None:
+        return False
+
+    wallet_writes.update("id", wallet_id, **values)
+
+    if wallet is not None:
+        for column, value in values.items():
+            if isinstance(value, Increment):
+                value = value.apply(wallet.__dict__.get(column))
+            set_committed_value(wallet, column, value)
+
+    return True
+
+
+async def update_twitter_token(address: str, updated_token: str | None) -> bool:
     """
     Updates the Twitter token for a wallet with the given private_key.
 
@@ -38,119 +174,161 @@ def update_twitter_token(address: str, updated_token: str | None) -> bool:
     if not updated_token:
         return False
 
-    wallet = db.one(Wallet, Wallet.address == address)
-    if not wallet:
-        return False
+    return await _update_wallet("address", address, twitter_token=updated_token)
 
-    wallet.twitter_token = updated_token
-    db.commit()
-    return True
 
+async def update_next_action_time(address: str, next_action_time) -> bool:
+    return await _update_wallet("address", address, next_action_time=next_action_time)
 
-def update_next_action_time(address: str, next_action_time) -> bool:
-    wallet = db.one(Wallet, Wallet.address == address)
-    if not wallet:
-        return False
-    wallet.next_action_time = next_action_time
-    db.commit()
-    return True
 
+async def update_next_game_time(address: str, next_game_action_time) -> bool:
+    return await _update_wallet("address", address, next_game_action_time=next_game_action_time)
 
-def update_next_game_time(address: str, next_game_action_time) -> bool:
-    wallet = db.one(Wallet, Wallet.address == address)
-    if not wallet:
-        return False
-    wallet.next_game_action_time = next_game_action_time
-    db.commit()
-    return True
 
+async def update_rank(address: str, rank: int) -> bool:
+    return await _update_wallet("address", address, rank=rank)
 
-def update_rank(address: str, rank: int) -> bool:
-    wallet = db.one(Wallet, Wallet.address == address)
-    if not wallet:
-        return False
 
-    wallet.rank = rank
-    db.commit()
-    return True
+async def update_points(address: str, points: int) -> bool:
+    return await _update_wallet("address", address, points=points)
 
 
-def update_points(address: str, points: int) -> bool:
-    wallet = db.one(Wallet, Wallet.address == address)
-    if not wallet:
-        return False
+async def add_count_game(address: str) -> bool:
+    # an empty counter starts from 1, as before
+    return await _update_wallet("address", address, completed_games=Increment(delta=1, empty=1))
 
-    wallet.points = points
-    db.commit()
-    return True
 
+async def replace_bad_proxy(id: int, new_proxy: str) -> bool:
+    return await _update_wallet("id", id, proxy=new_proxy, proxy_status="OK")
 
-def add_count_game(address: str) -> bool:
-    wallet = db.one(Wallet, Wallet.address == address)
-    if not wallet:
-        return False
-    if not wallet.completed_games:
-        wallet.completed_games = 1
 
-    wallet.completed_games += 1
-    db.commit()
-    return True
+async def replace_bad_twitter(id: int, new_token: str) -> bool:
+    return await _update_wallet("id", id, twitter_token=new_token, twitter_status="OK")
 
 
-def replace_bad_proxy(id: int, new_proxy: str) -> bool:
-    wallet = db.one(Wallet, Wallet.id == id)
-    if not wallet:
-        return False
-    wallet.proxy = new_proxy
-    wallet.proxy_status = "OK"
-    db.commit()
-    return True
+async def mark_proxy_as_bad(id: int) -> bool:
+    return await _update_wallet("id", id, proxy_status="BAD")
 
 
-def replace_bad_twitter(id: int, new_token: str) -> bool:
-    wallet = db.one(Wallet, Wallet.id == id)
-    if not wallet:
-        return False
-    wallet.twitter_token = new_token
-    wallet.twitter_status = "OK"
-    db.commit()
-    return True
+async def mark_twitter_status(id: int, status: str) -> bool:
+    return await _update_wallet("id", id, twitter_status=status)
 
 
-def mark_proxy_as_bad(id: int) -> bool:
-    wallet = db.one(Wallet, Wallet.id == id)
-    if not wallet:
-        return False
-    wallet.proxy_status = "BAD"
-    db.commit()
-    return True
+async def get_wallets_with_bad_proxy() -> list:
+    return await adb.all(Wallet, Wallet.proxy_status == "BAD")
 
 
-def mark_twitter_status(id: int, status: str) -> bool:
-    wallet = db.one(Wallet, Wallet.id == id)
-    if not wallet:
-        return False
-    wallet.twitter_status = status
-    db.commit()
-    return True
+async def get_wallets_with_bad_twitter() -> list:
+    return await adb.all(Wallet, Wallet.twitter_status == "BAD")
 
 
-def get_wallets_with_bad_proxy() -> list:
-    return db.all(Wallet, Wallet.proxy_status == "BAD")
+async def last_faucet_claim(address: str, last_faucet_claim) -> bool:
+    return await _update_wallet("address", address, last_faucet_claim=last_faucet_claim)
 
 
-def get_wallets_with_bad_twitter() -> list:
-    return db.all(Wallet, Wallet.twitter_status == "BAD")
+JOURNAL_OPEN_STATUSES = ("signed", "sent")
 
 
-def last_faucet_claim(address: str, last_faucet_claim) -> bool:
-    wallet = db.one(Wallet, Wallet.address == address)
-    if not wallet:
-        return False
-    wallet.last_faucet_claim = last_faucet_claim
-    db.commit()
-    return True
+async def get_open_journal_entry(intent_key: str) -> TxJournal | None:
+    """
+    Gets the latest journaled transaction of an intent that has not been finished yet.
+    """
+    return await adb.one(TxJournal, TxJournal.intent_key == intent_key, TxJournal.status.in_(JOURNAL_OPEN_STATUSES), from_the_end=True)
+
+
+async def journal_tx(intent_key: str, chain_id: int, address: str, nonce: int, tx_hash: str, raw_tx: str) -> TxJournal:
+    """
+    Records a signed transaction before it is broadcast.
+    """
+    now = datetime.now()
+    values = dict(
+        intent_key=intent_key,
+        chain_id=chain_id,
+        address=address,
+        nonce=nonce,
+        tx_hash=tx_hash,
+        raw_tx=raw_tx,
+        replaced_hashes="",
+        status="signed",
+        created_at=now,
+        updated_at=now,
+    )
+    return TxJournal(id=await adb.write_row(TxJournal, values), **values)
+
+
+async def _update_journal_entry(entry: TxJournal, **values) -> None:
+    values["updated_at"] = datetime.now()
+    for column, value in values.items():
+        setattr(entry, column, value)
+    await adb.write_row(TxJournal, values, pk=entry.id)
+
+
+async def journal_replacement(entry: TxJournal, tx_hash: str, raw_tx: str) -> None:
+    """
+    Records a replacement (same nonce, bumped fees) of a journaled transaction before it is broadcast.
+    """
+    await _update_journal_entry(entry, replaced_hashes=",".join(entry.hashes), tx_hash=tx_hash, raw_tx=raw_tx)
+
+
+async def update_journal_status(entry: TxJournal, status: str, tx_hash: str | None = None) -> None:
+    if tx_hash:
+        await _update_journal_entry(entry, status=status, tx_hash=tx_hash)
+    else:
+        await _update_journal_entry(entry, status=status)
+
+
+async def get_allowance(chain_id: int, owner: str, token: str, spender: str) -> Allowance | None:
+    return await adb.one(
+        Allowance,
+        Allowance.chain_id == chain_id,
+        Allowance.owner == owner,
+        Allowance.token == token,
+        Allowance.spender == spender,
+    )
+
+
+async def set_allowance(chain_id: int, owner: str, token: str, spender: str, amount: int) -> Allowance:
+    """
+    Stores an allowance read from the chain or set by a confirmed approval.
+    """
+    allowance = await get_allowance(chain_id=chain_id, owner=owner, token=token, spender=spender)
+    values = dict(amount=str(amount), updated_at=datetime.now())
+    if not allowance:
+        values.update(chain_id=chain_id, owner=owner, token=token, spender=spender)
+        return Allowance(id=await adb.write_row(Allowance, values), **values)
+
+    allowance.amount = values["amount"]
+    allowance.updated_at = values["updated_at"]
+    await adb.write_row(Allowance, values, pk=allowance.id)
+    return allowance
+
+
+async def spend_allowance(allowance: Allowance, amount: int) -> None:
+    """
+    Decreases a stored allowance by an amount that is about to be spent. The timestamp is kept, so the value is still
+    refreshed from the chain once it expires.
+    """
+    allowance.amount = str(max(allowance.wei - amount, 0))
+    await adb.write_row(Allowance, {"amount": allowance.amount}, pk=allowance.id)
 
 
 db = DB(f"sqlite:///{WALLETS_DB}", echo=False, pool_recycle=3600, connect_args={"check_same_thread": False})
 db.create_tables(Base)
+db.ensure_model_indexes(Wallet)
+# wallet updates go through the write-behind buffer; a query must never flush a changed object through the synchronous
+# engine, which would hold the SQLite write lock until the next commit and block the async writers
+db.s.autoflush = False
+adb = AsyncDB(f"sqlite+aiosqlite:///{WALLETS_DB}", echo=False)
+wallet_writes = WriteBehindBuffer(adb, Wallet)
+_wallet_ids: dict[str, int] = {}
+_existing_wallets: set[int] = set()
+
+
+@event.listens_for(Wallet, "load")
+def _overlay_on_load(wallet: Wallet, context) -> None:
+    wallet_writes.overlay(wallet)
+
+
+@event.listens_for(Wallet, "refresh")
+def _overlay_on_refresh(wallet: Wallet, context, attrs) -> None:
+    wallet_writes.overlay(wallet)
@@ -0,0 +1,197 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Callable
+
+from loguru import logger
+from sqlalchemy import bindparam, case, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from utils.db_api.async_db import AsyncDB
+
+
+class Increment:
+    """
+    A pending 'column += delta'. A NULL or zero column counts from 'empty' (add_count_game turns 0 into 2, as it always did).
+    """
+
+    __slots__ = ("delta", "empty")
+
+    def __init__(self, delta: int = 1, empty: int = 0) -> None:
+        self.delta = delta
+        self.empty = empty
+
+    def apply(self, value: int | None) -> int:
+        return (value if value else self.empty) + self.delta
+
+
+class WriteBehindBuffer:
+    """
+    Collects column updates of one table in memory and writes them in batches.
+
+    Updates of the same row are merged, so a wallet that changes three times between flushes is written once. A flush
+    runs when 'max_pending' rows are waiting, every 'flush_interval' seconds and on close(); all pending rows are written
+    in one transaction with an executemany UPDATE per set of columns. Readers of the process see pending values through
+    overlay(), which is applied to every loaded or refreshed ORM object.
+
+    If 'sink' is set (in a worker process of the sharded runner), batches are handed to it instead of the database, and
+    the process owning the database merges them into its own buffer.
+    """
+
+    def __init__(self, db: AsyncDB, entity, max_pending: int = 256, flush_interval: float = 2.0) -> None:
+        self.db = db
+        self.entity = entity
+        self.table = entity.__table__
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.flushes = 0
+        self.rows_written = 0
+        self.updates = 0
+        self.last_latency = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._pending: dict[tuple[str, object], dict[str, object]] = {}
+        self._in_flight: dict[tuple[str, object], dict[str, object]] = {}
+        self._task: asyncio.Task | None = None
+        self._flushing: asyncio.Lock | None = None
+        self.sink: Callable[[dict], None] | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def is_pending(self, key_column: str, key) -> bool:
+        """
+        Whether updates of the row are waiting or being written.
+        """
+        return (key_column, key) in self._pending or (key_column, key) in self._in_flight
+
+    def update(self, key_column: str, key, **values) -> None:
+        """
+        Queue new column values of the row where 'key_column' equals 'key'. Values may be Increment instances.
+        """
+        self.updates += 1
+        self._merge(self._pending.setdefault((key_column, key), {}), values)
+
+        if len(self._pending) >= self.max_pending:
+            asyncio.ensure_future(self.flush())
+        elif self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._flush_later())
+
+    def merge(self, batch: dict) -> None:
+        """
+        Queue a batch flushed by another buffer (a worker process of the sharded runner).
+        """
+        for (key_column, key), values in batch.items():
+            self.update(key_column, key, **values)
+
+    @staticmethod
+    def _merge(row: dict, values: dict) -> None:
+        for column, value in values.items():
+            previous = row.get(column)
+            if isinstance(value, Increment) and previous is not None:
+                if isinstance(previous, Increment):
+                    value = Increment(delta=previous.delta + value.delta, empty=previous.empty)
+                else:
+                    value = value.apply(previous)
+            row[column] = value
+
+    def overlay(self, row_object) -> None:
+        """
+        Apply pending values to an ORM object loaded from the database (read-your-writes).
+        """
+        for pending in (self._in_flight, self._pending):
+            if not pending:
+                continue
+
+            for key_column in ("id", "address"):
+                values = pending.get((key_column, row_object.__dict__.get(key_column)))
+                if not values:
+                    continue
+
+                for column, value in values.items():
+                    if isinstance(value, Increment):
+                        value = value.apply(row_object.__dict__.get(column))
+                    set_committed_value(row_object, column, value)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    def _statements(self, pending: dict) -> list[tuple]:
+        groups = defaultdict(list)
+        for (key_column, key), values in pending.items():
+            plain = tuple(sorted(column for column, value in values.items() if not isinstance(value, Increment)))
+            increments = tuple(sorted((column, value.empty) for column, value in values.items() if isinstance(value, Increment)))
+            params = {"_key": key}
+            params.update({f"_{column}": value for column, value in values.items() if not isinstance(value, Increment)})
+            params.update({f"_{column}": value.delta for column, value in values.items() if isinstance(value, Increment)})
+            groups[(key_column, plain, increments)].append(params)
+
+        statements = []
+        for (key_column, plain, increments), params in groups.items():
+            columns = {column: bindparam(f"_{column}") for column in plain}
+            for column, empty in increments:
+                current = self.table.c[column]
+                columns[column] = case((current > 0, current), else_=empty) + bindparam(f"_{column}")
+            statements.append((update(self.table).where(self.table.c[key_column] == bindparam("_key")).values(**columns), params))
+        return statements
+
+    async def flush(self) -> None:
+        """
+        Write all pending updates in one transaction.
+        """
+        if self._flushing is None:
+            self._flushing = asyncio.Lock()
+
+        async with self._flushing:
+            if not self._pending:
+                return
+
+            pending = self._in_flight = self._pending
+            self._pending = {}
+            started = time.perf_counter()
+            try:
+                if self.sink is not None:
+                    self.sink(pending)
+                else:
+                    async with self.db.session() as session:
+                        for stmt, params in self._statements(pending):
+                            await session.execute(stmt, params)
+
+            except BaseException as err:
+                # updates queued during the flush are newer and are applied on top of the failed ones
+                self._in_flight = {}
+                for key, values in pending.items():
+                    newer = self._pending.get(key)
+                    if newer:
+                        self._merge(values, newer)
+                    self._pending[key] = values
+                if not isinstance(err, Exception):
+                    raise
+
+                logger.error(f"Write-behind flush of {len(pending)} rows failed, will retry: {err}")
+                if self._task is None or self._task.done():
+                    self._task = asyncio.ensure_future(self._flush_later())
+                return
+
+            self._in_flight = {}
+            latency = time.perf_counter() - started
+            self.flushes += 1
+            self.rows_written += len(pending)
+            self.last_latency = latency
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    async def close(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        await self.flush()
+
+    def summary(self) -> str:
+        avg = self.total_latency / self.flushes if self.flushes else 0.0
+        return (
+            f"Write-behind ({self.table.name}): updates: {self.updates} | rows written: {self.rows_written} | flushes: {self.flushes} | "
+            f"pending: {self.pending} | flush latency: last {self.last_latency * 1000:.1f}ms, avg {avg * 1000:.1f}ms, "
+            f"max {self.max_latency * 1000:.1f}ms"
+        )
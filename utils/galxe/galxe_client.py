@@ -62,7 +62,7 @@ class GalxeClient:
         for network in network_values:
             if network.name in Settings().network_for_bridge:
                 try:
-                    client = Client(private_key=self.client.account._private_key.hex(), network=network, proxy=self.client.proxy)
+                    client = self.client.on(network)
                     balance = await client.wallet.balance()
                     if balance.Ether > Settings().random_eth_for_bridge_max:
                         base_client = Base(client=client, wallet=self.wallet)
@@ -126,7 +126,7 @@ class ResourceManager:
         if not new_proxy:
             return False, "No available reserve proxies"
 
-        success = replace_bad_proxy(id, new_proxy)
+        success = await replace_bad_proxy(id, new_proxy)
 
         if success:
             return True, f"Proxy successfully replaced with {new_proxy}"
@@ -147,7 +147,7 @@ class ResourceManager:
         if not new_token:
             return False, "No available reserve Twitter tokens"
 
-        success = replace_bad_twitter(id, new_token)
+        success = await replace_bad_twitter(id, new_token)
 
         if success:
             logger.success("Twitter token successfully replaced in database")
@@ -167,7 +167,7 @@ class ResourceManager:
         Returns:
             Success status
         """
-        return mark_proxy_as_bad(id)
+        return await mark_proxy_as_bad(id)
 
     async def get_bad_proxies(self) -> List:
         """
@@ -176,7 +176,7 @@ class ResourceManager:
         Returns:
             List of wallets
         """
-        return get_wallets_with_bad_proxy()
+        return await get_wallets_with_bad_proxy()
 
     async def get_bad_twitter(self) -> List:
         """
@@ -185,7 +185,7 @@ class ResourceManager:
         Returns:
             List of wallets
         """
-        return get_wallets_with_bad_twitter()
+        return await get_wallets_with_bad_twitter()
 
     async def replace_all_bad_proxies(self) -> Tuple[int, int]:
         """
@@ -116,32 +116,28 @@ class TwitterClient:
 
             if self.twitter_account.status == twitter.AccountStatus.GOOD:
                 logger.success(f"{self.user} Twitter client initialized")
-                update_twitter_token(address=self.user.address, updated_token=self.twitter_account.auth_token)
+                await update_twitter_token(address=self.user.address, updated_token=self.twitter_account.auth_token)
 
-                self.user.twitter_status = TwitterStatuses.ok
+                await mark_twitter_status(id=self.user.id, status=TwitterStatuses.ok)
                 return True
 
         except AccountSuspended:
-            self.user.twitter_status = TwitterStatuses.suspended
-            mark_twitter_status(id=self.user.id, status=TwitterStatuses.suspended)
+            await mark_twitter_status(id=self.user.id, status=TwitterStatuses.suspended)
             logger.error(f"{self.user} | Twitter Suspended, try to reauth manually")
             return False
 
         except BadAccountToken:
-            self.user.twitter_status = TwitterStatuses.relogin
-            mark_twitter_status(id=self.user.id, status=TwitterStatuses.bad_token)
+            await mark_twitter_status(id=self.user.id, status=TwitterStatuses.bad_token)
             logger.error(f"{self.user} | Twitter BadToken, try to reauth manually")
             return False
 
         except AccountLocked:
-            self.user.twitter_status = TwitterStatuses.locked
-            mark_twitter_status(id=self.user.id, status=TwitterStatuses.locked)
+            await mark_twitter_status(id=self.user.id, status=TwitterStatuses.locked)
             logger.error(f"{self.user} | Twitter Locked, replace twitter token")
             return False
 
         except AccountNotFound:
-            self.user.twitter_status = TwitterStatuses.not_found
-            mark_twitter_status(id=self.user.id, status=TwitterStatuses.not_found)
+            await mark_twitter_status(id=self.user.id, status=TwitterStatuses.not_found)
             logger.error(f"{self.user} | Twitter Not Found, replace twitter token")
             return False
 